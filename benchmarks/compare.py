@@ -0,0 +1,115 @@
+"""
+Compares a benchmarks/run.py result file against a stored baseline.
+
+Exits non-zero if any scenario regressed beyond the allowed tolerance:
+  - latency p50/p95/p99 higher by more than --latency-tolerance (default 15%)
+  - throughput lower by more than --throughput-tolerance (default 10%)
+  - DB queries per request higher at all (query counts are deterministic)
+  - peak RSS higher by more than --rss-tolerance (default 20%)
+  - error rate higher by more than --error-rate-tolerance (absolute, default 0.01)
+
+Baselines are per machine and not committed; record one on the benchmark host first.
+
+Usage:
+    python benchmarks/compare.py results.json --update-baseline   # record/accept results as the baseline
+    python benchmarks/compare.py results.json                     # compare against benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def _relative_change(current, baseline):
+    if current is None or baseline in (None, 0):
+        return None
+    return (current - baseline) / baseline
+
+
+def compare(current, baseline, args):
+    """ Returns (regressions, notes) as lists of human-readable lines """
+    regressions, notes = [], []
+    current_scenarios = current.get('scenarios', {})
+
+    for name, base in sorted(baseline.get('scenarios', {}).items()):
+        cur = current_scenarios.get(name)
+        if cur is None:
+            notes.append(f"{name}: missing from current results (skipped)")
+            continue
+
+        for pct in ('p50', 'p95', 'p99'):
+            change = _relative_change(cur['latency_ms'].get(pct), base['latency_ms'].get(pct))
+            if change is not None and change > args.latency_tolerance:
+                regressions.append(
+                    f"{name}: latency {pct} {base['latency_ms'][pct]}ms -> {cur['latency_ms'][pct]}ms (+{change:.0%})"
+                )
+
+        change = _relative_change(cur.get('throughput_rps'), base.get('throughput_rps'))
+        if change is not None and -change > args.throughput_tolerance:
+            regressions.append(
+                f"{name}: throughput {base['throughput_rps']} -> {cur['throughput_rps']} rps ({change:.0%})"
+            )
+
+        base_queries, cur_queries = base.get('db_queries_per_request'), cur.get('db_queries_per_request')
+        if base_queries is not None and cur_queries is not None and cur_queries > base_queries:
+            regressions.append(f"{name}: DB queries/request {base_queries} -> {cur_queries}")
+
+        base_errors, cur_errors = base.get('error_rate') or 0, cur.get('error_rate') or 0
+        if cur_errors - base_errors > args.error_rate_tolerance:
+            regressions.append(f"{name}: error rate {base_errors:.2%} -> {cur_errors:.2%}")
+
+        for service, base_rss in (base.get('peak_rss_bytes') or {}).items():
+            cur_rss = (cur.get('peak_rss_bytes') or {}).get(service)
+            change = _relative_change(cur_rss, base_rss)
+            if change is not None and change > args.rss_tolerance:
+                regressions.append(
+                    f"{name}: {service} peak RSS {base_rss / 2**20:.0f}MiB -> {cur_rss / 2**20:.0f}MiB (+{change:.0%})"
+                )
+
+    for name in sorted(set(current_scenarios) - set(baseline.get('scenarios', {}))):
+        notes.append(f"{name}: new scenario, no baseline")
+    return regressions, notes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('results', help="Result JSON written by benchmarks/run.py")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--latency-tolerance', type=float, default=0.15)
+    parser.add_argument('--throughput-tolerance', type=float, default=0.10)
+    parser.add_argument('--rss-tolerance', type=float, default=0.20)
+    parser.add_argument('--error-rate-tolerance', type=float, default=0.01)
+    parser.add_argument('--update-baseline', action='store_true', help="Copy results over the baseline and exit.")
+    args = parser.parse_args()
+
+    if args.update_baseline:
+        shutil.copyfile(args.results, args.baseline)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one.")
+        return 2
+
+    with open(args.results) as fh:
+        current = json.load(fh)
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)
+
+    regressions, notes = compare(current, baseline, args)
+    for line in notes:
+        print(f"  note: {line}")
+    if regressions:
+        print(f"{len(regressions)} regression(s) against {args.baseline}:")
+        for line in regressions:
+            print(f"  REGRESSION {line}")
+        return 1
+    print(f"No regressions against {args.baseline}.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
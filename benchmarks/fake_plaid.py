@@ -0,0 +1,192 @@
+"""
+Local fake Plaid server for benchmarks and load tests.
+
+Implements just enough of the Plaid API for the finance service:
+  POST /link/token/create
+  POST /item/public_token/exchange
+  POST /transactions/sync   (cursor-paginated, deterministic synthetic data)
+
+Point the finance service at it with PLAID_HOST=http://127.0.0.1:8090.
+--delay-ms adds a fixed upstream latency (plus optional jitter) to every call,
+which is how the Plaid-slowness scenarios are reproduced.
+
+Usage:
+    python benchmarks/fake_plaid.py --port 8090 --delay-ms 250 --transactions-per-item 2000
+"""
+import argparse
+import hashlib
+import json
+import random
+import time
+import uuid
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MERCHANTS = [
+    ("Starbucks", ["Food and Drink", "Restaurants", "Coffee Shop"]),
+    ("Uber", ["Travel", "Taxi"]),
+    ("Amazon", ["Shops", "Digital Purchase"]),
+    ("Shell", ["Travel", "Gas Stations"]),
+    ("Whole Foods", ["Shops", "Supermarkets and Groceries"]),
+    ("Netflix", ["Service", "Subscription"]),
+]
+
+
+def _request_id():
+    return uuid.uuid4().hex[:15]
+
+
+def _plaid_error(status, error_type, error_code, message):
+    return status, {
+        'error_type': error_type,
+        'error_code': error_code,
+        'error_message': message,
+        'display_message': None,
+        'request_id': _request_id(),
+    }
+
+
+def _synthetic_transaction(item_id, index):
+    # Seeded per (item, index) so every run and every page is reproducible
+    rng = random.Random(f"{item_id}:{index}")
+    name, category = MERCHANTS[rng.randrange(len(MERCHANTS))]
+    tx_date = (date.today() - timedelta(days=rng.randrange(365))).isoformat()
+    return {
+        'account_id': f"{item_id}-acc-0",
+        'account_owner': None,
+        'amount': round(rng.uniform(1, 250), 2),
+        'iso_currency_code': 'USD',
+        'unofficial_currency_code': None,
+        'category': category,
+        'category_id': hashlib.md5(' '.join(category).encode()).hexdigest()[:8],
+        'check_number': None,
+        'date': tx_date,
+        'datetime': None,
+        'authorized_date': tx_date,
+        'authorized_datetime': None,
+        'location': {
+            'address': None, 'city': None, 'region': None, 'postal_code': None,
+            'country': None, 'lat': None, 'lon': None, 'store_number': None,
+        },
+        'merchant_name': name,
+        'name': f"{name.upper()} {rng.randint(1000, 9999)}",
+        'payment_channel': rng.choice(['online', 'in store', 'other']),
+        'payment_meta': {
+            'by_order_of': None, 'payee': None, 'payer': None, 'payment_method': None,
+            'payment_processor': None, 'ppd_id': None, 'reason': None, 'reference_number': None,
+        },
+        'pending': False,
+        'pending_transaction_id': None,
+        'transaction_code': None,
+        'transaction_id': f"{item_id}-tx-{index}",
+        'transaction_type': 'place',
+    }
+
+
+class FakePlaidHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1' # Keep-alive, like the real API
+    disable_nagle_algorithm = True # Otherwise delayed ACKs add ~40ms to every keep-alive response
+    config = None # Set by main()
+
+    def log_message(self, format, *args):
+        if self.config.verbose:
+            super().log_message(format, *args)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self._send(*_plaid_error(400, 'INVALID_REQUEST', 'INVALID_BODY', 'Body is not valid JSON.'))
+
+        delay = self.config.delay_ms + random.uniform(0, self.config.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000)
+
+        if self.config.error_rate and random.random() < self.config.error_rate:
+            return self._send(*_plaid_error(500, 'API_ERROR', 'INTERNAL_SERVER_ERROR', 'Injected failure.'))
+
+        routes = {
+            '/link/token/create': self._link_token_create,
+            '/item/public_token/exchange': self._public_token_exchange,
+            '/transactions/sync': self._transactions_sync,
+        }
+        handler = routes.get(self.path)
+        if handler is None:
+            return self._send(*_plaid_error(404, 'INVALID_REQUEST', 'NOT_FOUND', f"Unknown endpoint {self.path}"))
+        self._send(*handler(body))
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _link_token_create(self, body):
+        expiration = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() + 4 * 3600))
+        return 200, {
+            'link_token': f"link-sandbox-{uuid.uuid4()}",
+            'expiration': expiration,
+            'request_id': _request_id(),
+        }
+
+    def _public_token_exchange(self, body):
+        public_token = body.get('public_token')
+        if not public_token:
+            return _plaid_error(400, 'INVALID_REQUEST', 'MISSING_FIELDS', 'public_token is required.')
+        item_id = hashlib.sha1(public_token.encode()).hexdigest()[:24]
+        return 200, {
+            'access_token': f"access-sandbox-{item_id}",
+            'item_id': item_id,
+            'request_id': _request_id(),
+        }
+
+    def _transactions_sync(self, body):
+        access_token = body.get('access_token') or ''
+        if not access_token.startswith('access-sandbox-'):
+            return _plaid_error(400, 'INVALID_INPUT', 'INVALID_ACCESS_TOKEN', 'Provided access token is invalid.')
+        item_id = access_token[len('access-sandbox-'):]
+        count = min(int(body.get('count') or 100), 500)
+        try:
+            offset = int(body.get('cursor') or 0)
+        except ValueError:
+            return _plaid_error(400, 'INVALID_INPUT', 'INVALID_CURSOR', 'Cursor is invalid.')
+
+        end = min(offset + count, self.config.transactions_per_item)
+        return 200, {
+            'added': [_synthetic_transaction(item_id, i) for i in range(offset, end)],
+            'modified': [],
+            'removed': [],
+            'next_cursor': str(end),
+            'has_more': end < self.config.transactions_per_item,
+            'request_id': _request_id(),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--delay-ms', type=float, default=0.0, help="Fixed latency added to every response.")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="Extra uniform random latency, 0..N ms.")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of calls answered with a 500.")
+    parser.add_argument('--transactions-per-item', type=int, default=1000)
+    parser.add_argument('--verbose', action='store_true')
+    config = parser.parse_args()
+
+    FakePlaidHandler.config = config
+    server = ThreadingHTTPServer((config.host, config.port), FakePlaidHandler)
+    server.daemon_threads = True
+    print(f"Fake Plaid listening on http://{config.host}:{config.port} (delay {config.delay_ms}ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,420 @@
+"""
+Load driver for the finance and AI core services.
+
+Runs each scenario at a fixed concurrency for a fixed number of requests and
+writes latency percentiles (p50/p95/p99), throughput, error counts, DB queries
+per request (from the finance service's /metrics) and peak RSS (from --*-pid)
+to a JSON file that benchmarks/compare.py can diff against a baseline.
+
+Typical run, against services started locally with a seeded database
+(`python manage.py seed_synthetic_data --tokens-out tokens.json`) and
+benchmarks/fake_plaid.py in place of Plaid:
+
+    python benchmarks/run.py --finance-url http://127.0.0.1:8002 \\
+        --ai-core-url http://127.0.0.1:8050 --tokens tokens.json \\
+        --concurrency 32 --requests 2000 --out results.json
+
+Only the standard library is used, so the driver runs anywhere Python does.
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from urllib.request import urlopen
+
+# --- Scenarios ---
+# Each scenario is (service, method, path_fn, body_fn). path_fn/body_fn take an
+# rng so every worker's request stream is reproducible for a given --seed.
+
+DESCRIPTIONS = [
+    "STARBUCKS STORE #1234", "UBER *TRIP 8831", "AMAZON MKTPLACE PMTS", "SHELL OIL 5521",
+    "WHOLEFDS MKT 102", "NETFLIX.COM", "PAYROLL DEPOSIT ACME CORP", "CHIPOTLE 0921",
+]
+
+
+def _transactions_batch(rng, size):
+    return [
+        {"amount": round(rng.uniform(-250, 50), 2), "description": rng.choice(DESCRIPTIONS), "type": "EXPENSE"}
+        for _ in range(size)
+    ]
+
+
+def scenario_table(args):
+    return {
+        'finance_accounts_list': (
+            'finance', 'GET', lambda rng: '/api/finance/accounts/', None,
+        ),
+        'finance_transactions_list': (
+            'finance', 'GET', lambda rng: f"/api/finance/transactions/?page={rng.randint(1, args.max_page)}", None,
+        ),
+        'finance_transactions_filtered': (
+            'finance', 'GET',
+            lambda rng: f"/api/finance/transactions/?start_date=2000-01-01&category={rng.choice(['Groceries', 'Travel'])}",
+            None,
+        ),
+        'finance_plaid_link_token': (
+            'finance', 'POST', lambda rng: '/api/finance/plaid/create_link_token/', lambda rng: {},
+        ),
+        'ai_analyze_financial': (
+            'ai_core', 'POST', lambda rng: '/analyze/financial',
+            lambda rng: {
+                "user_id": f"bench_user_{rng.randrange(1000)}",
+                "transactions": _transactions_batch(rng, args.analyze_batch_size),
+                "requested_insights": ["spending_patterns", "savings_suggestions"],
+            },
+        ),
+        'ai_categorize_transaction': (
+            'ai_core', 'POST', lambda rng: '/categorize/transaction',
+            lambda rng: {"description": rng.choice(DESCRIPTIONS)},
+        ),
+    }
+
+
+def build_scenarios(args):
+    scenarios = scenario_table(args)
+    base_urls = {'finance': args.finance_url, 'ai_core': args.ai_core_url}
+    selected = args.scenarios.split(',') if args.scenarios else list(scenarios)
+    unknown = set(selected) - set(scenarios)
+    if unknown:
+        sys.exit(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+    return {name: scenarios[name] for name in selected if base_urls[scenarios[name][0]]}
+
+
+# --- HTTP ---
+
+class Connection:
+    """ One persistent keep-alive connection per worker thread """
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        conn_cls = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self._factory = lambda: conn_cls(parts.hostname, parts.port, timeout=timeout)
+        self._conn = self._factory()
+
+    def request(self, method, path, body, headers):
+        for attempt in (0, 1):
+            try:
+                self._conn.request(method, path, body=body, headers=headers)
+                response = self._conn.getresponse()
+                response.read()
+                return response.status
+            except (http.client.HTTPException, ConnectionError, OSError):
+                # The server may close idle keep-alive connections; reconnect once
+                self._conn.close()
+                self._conn = self._factory()
+                if attempt:
+                    raise
+
+    def close(self):
+        self._conn.close()
+
+
+def scrape_metric_totals(base_url, names, timeout=10):
+    """ Sums every sample of the given metric names from a Prometheus /metrics endpoint """
+    totals = dict.fromkeys(names, 0.0)
+    try:
+        with urlopen(base_url.rstrip('/') + '/metrics', timeout=timeout) as response:
+            text = response.read().decode()
+    except (OSError, http.client.HTTPException):
+        return None
+    for line in text.splitlines():
+        match = re.match(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{.*\})?\s+([0-9.eE+-]+|NaN)$', line)
+        if match and match.group(1) in totals:
+            totals[match.group(1)] += float(match.group(3))
+    return totals
+
+
+# --- Memory ---
+
+def _descendants(pid):
+    children = []
+    task_dir = f"/proc/{pid}/task"
+    for tid in os.listdir(task_dir) if os.path.isdir(task_dir) else []:
+        try:
+            with open(f"{task_dir}/{tid}/children") as fh:
+                children.extend(int(c) for c in fh.read().split())
+        except OSError:
+            pass
+    result = list(children)
+    for child in children:
+        result.extend(_descendants(child))
+    return result
+
+
+def rss_bytes(pid):
+    """ Resident memory of a process and all its descendants (e.g. gunicorn master + workers) """
+    total = 0
+    for p in [pid] + _descendants(pid):
+        try:
+            with open(f"/proc/{p}/status") as fh:
+                for line in fh:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            pass
+    return total
+
+
+class RssSampler(threading.Thread):
+    """ Samples RSS of the given pids in the background and keeps the peak """
+
+    def __init__(self, pids, interval=0.25):
+        super().__init__(daemon=True)
+        self.pids = {name: pid for name, pid in pids.items() if pid}
+        self.interval = interval
+        self.peak = dict.fromkeys(self.pids, 0)
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            for name, pid in self.pids.items():
+                self.peak[name] = max(self.peak[name], rss_bytes(pid))
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        return self.peak
+
+
+# --- Runner ---
+
+def _auth_headers(service, tokens, index):
+    headers = {'Content-Type': 'application/json'}
+    if service == 'finance' and tokens:
+        headers['Authorization'] = f"Bearer {tokens[index % len(tokens)]}"
+    return headers
+
+
+class BackgroundLoad:
+    """
+    Keeps `concurrency` requests of one scenario in flight until stopped, e.g.
+    slow Plaid-bound calls while another scenario is measured. Under WSGI these
+    occupy workers and the measured scenario queues behind them; under ASGI they
+    should not.
+    """
+
+    def __init__(self, name, scenario, args, tokens, concurrency):
+        self.name = name
+        self.scenario = scenario
+        self.args = args
+        self.tokens = tokens
+        self.statuses = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads = [threading.Thread(target=self._worker, args=(i,), daemon=True) for i in range(concurrency)]
+
+    def _worker(self, index):
+        service, method, path_fn, body_fn = self.scenario
+        base_url = self.args.finance_url if service == 'finance' else self.args.ai_core_url
+        rng = random.Random(f"{self.args.seed}:background:{self.name}:{index}")
+        conn = Connection(base_url, self.args.timeout)
+        headers = _auth_headers(service, self.tokens, index)
+        try:
+            while not self._stop_event.is_set():
+                body = json.dumps(body_fn(rng)) if body_fn else None
+                try:
+                    status = conn.request(method, path_fn(rng), body, headers)
+                except (OSError, http.client.HTTPException):
+                    status = 'connection_error'
+                with self._lock:
+                    self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+        finally:
+            conn.close()
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        # Workers finish their in-flight request before exiting
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join()
+        return self.statuses
+
+
+def percentile(sorted_values, pct):
+    """ Nearest-rank percentile of an already sorted list """
+    if not sorted_values:
+        return None
+    rank = min(len(sorted_values), max(1, math.ceil(pct / 100 * len(sorted_values)))) - 1
+    return sorted_values[rank]
+
+
+def run_scenario(name, scenario, args, tokens):
+    service, method, path_fn, body_fn = scenario
+    base_url = args.finance_url if service == 'finance' else args.ai_core_url
+    per_worker = [args.requests // args.concurrency + (1 if i < args.requests % args.concurrency else 0)
+                  for i in range(args.concurrency)]
+
+    def worker(index):
+        rng = random.Random(f"{args.seed}:{name}:{index}")
+        conn = Connection(base_url, args.timeout)
+        latencies, statuses = [], {}
+        headers = _auth_headers(service, tokens, index)
+        try:
+            for _ in range(per_worker[index]):
+                body = json.dumps(body_fn(rng)) if body_fn else None
+                start = time.perf_counter()
+                try:
+                    status = conn.request(method, path_fn(rng), body, headers)
+                except (OSError, http.client.HTTPException):
+                    status = 'connection_error'
+                latencies.append(time.perf_counter() - start)
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+        finally:
+            conn.close()
+        return latencies, statuses
+
+    query_metrics = ['finance_db_queries_per_request_sum', 'finance_db_queries_per_request_count']
+    before = scrape_metric_totals(args.finance_url, query_metrics) if service == 'finance' else None
+    sampler = RssSampler({'finance': args.finance_pid, 'ai_core': args.ai_core_pid})
+    sampler.start()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(worker, range(args.concurrency)))
+    wall = time.perf_counter() - started
+
+    peak_rss = sampler.stop()
+    after = scrape_metric_totals(args.finance_url, query_metrics) if service == 'finance' else None
+
+    latencies = sorted(lat for lats, _ in results for lat in lats)
+    statuses = {}
+    for _, worker_statuses in results:
+        for status, count in worker_statuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+    ok = sum(count for status, count in statuses.items() if status.isdigit() and int(status) < 400)
+
+    queries_per_request = None
+    if before and after:
+        served = after['finance_db_queries_per_request_count'] - before['finance_db_queries_per_request_count']
+        if served:
+            queries_per_request = round(
+                (after['finance_db_queries_per_request_sum'] - before['finance_db_queries_per_request_sum']) / served, 2
+            )
+
+    to_ms = lambda value: round(value * 1000, 3) if value is not None else None
+    return {
+        'service': service,
+        'requests': len(latencies),
+        'concurrency': args.concurrency,
+        'wall_seconds': round(wall, 3),
+        'throughput_rps': round(ok / wall, 2) if wall else None,
+        'error_rate': round(1 - ok / len(latencies), 4) if latencies else None,
+        'status_codes': statuses,
+        'latency_ms': {
+            'p50': to_ms(percentile(latencies, 50)),
+            'p95': to_ms(percentile(latencies, 95)),
+            'p99': to_ms(percentile(latencies, 99)),
+            'max': to_ms(latencies[-1] if latencies else None),
+        },
+        'db_queries_per_request': queries_per_request,
+        'peak_rss_bytes': peak_rss or None,
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--finance-url', help="e.g. http://127.0.0.1:8002; finance scenarios are skipped if unset.")
+    parser.add_argument('--ai-core-url', help="e.g. http://127.0.0.1:8050; ai-core scenarios are skipped if unset.")
+    parser.add_argument('--tokens', help="JSON {username: access_token} written by seed_synthetic_data --tokens-out.")
+    parser.add_argument('--scenarios', help="Comma-separated subset of scenarios to run (default: all).")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=1000, help="Requests per scenario.")
+    parser.add_argument('--warmup', type=int, default=50, help="Untimed requests per scenario before measuring.")
+    parser.add_argument('--analyze-batch-size', type=int, default=100, help="Transactions per /analyze/financial call.")
+    parser.add_argument('--max-page', type=int, default=5, help="Highest transactions page to request.")
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--finance-pid', type=int, help="PID of the finance server (gunicorn master) for RSS sampling.")
+    parser.add_argument('--ai-core-pid', type=int, help="PID of the ai-core server for RSS sampling.")
+    parser.add_argument('--label', help="Free-form label stored in the results (e.g. 'wsgi', 'asgi').")
+    parser.add_argument('--background-scenario',
+                        help="Scenario kept in flight while the others are measured (e.g. finance_plaid_link_token).")
+    parser.add_argument('--background-concurrency', type=int, default=8,
+                        help="Concurrent requests for --background-scenario.")
+    parser.add_argument('--out', default='bench_results.json')
+    args = parser.parse_args()
+
+    if not args.finance_url and not args.ai_core_url:
+        parser.error("At least one of --finance-url / --ai-core-url is required.")
+    if args.concurrency < 1 or args.requests < 1:
+        parser.error("--concurrency and --requests must be positive.")
+
+    tokens = []
+    if args.tokens:
+        with open(args.tokens) as fh:
+            tokens = list(json.load(fh).values())
+
+    scenarios = build_scenarios(args)
+    background = None
+    if args.background_scenario:
+        table = scenario_table(args)
+        if args.background_scenario not in table:
+            parser.error(f"Unknown --background-scenario: {args.background_scenario}")
+        if not {'finance': args.finance_url, 'ai_core': args.ai_core_url}[table[args.background_scenario][0]]:
+            parser.error(f"--background-scenario {args.background_scenario} needs its service URL.")
+        if args.background_concurrency < 1:
+            parser.error("--background-concurrency must be positive.")
+        scenarios.pop(args.background_scenario, None)
+        background = BackgroundLoad(
+            args.background_scenario, table[args.background_scenario], args, tokens, args.background_concurrency
+        )
+        print(f"Starting background load: {args.background_scenario} @ concurrency {args.background_concurrency}", flush=True)
+        background.start()
+
+    results = {}
+    for name, scenario in scenarios.items():
+        if args.warmup:
+            warmup_args = argparse.Namespace(**{**vars(args), 'requests': args.warmup})
+            run_scenario(name, scenario, warmup_args, tokens)
+        print(f"Running {name} ({args.requests} requests @ concurrency {args.concurrency})...", flush=True)
+        results[name] = run_scenario(name, scenario, args, tokens)
+        lat = results[name]['latency_ms']
+        print(f"  p50={lat['p50']}ms p95={lat['p95']}ms p99={lat['p99']}ms "
+              f"rps={results[name]['throughput_rps']} errors={results[name]['error_rate']}")
+
+    background_statuses = background.stop() if background else None
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'git_revision': _git_revision(),
+            'label': args.label,
+            'python': sys.version.split()[0],
+            'args': {k: v for k, v in vars(args).items() if k != 'tokens'},
+        },
+        'scenarios': results,
+    }
+    if background:
+        report['background'] = {
+            'scenario': args.background_scenario,
+            'concurrency': args.background_concurrency,
+            'status_codes': background_statuses,
+        }
+    with open(args.out, 'w') as fh:
+        json.dump(report, fh, indent=2, sort_keys=True)
+    print(f"Results written to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
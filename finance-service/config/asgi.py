@@ -0,0 +1,14 @@
+"""
+ASGI config for the finance service.
+
+Served by Gunicorn with Uvicorn workers (see entrypoint.sh). Async views such as
+the Plaid endpoints run on the event loop; sync DRF views are run in a thread by
+Django's handler.
+"""
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+application = get_asgi_application()
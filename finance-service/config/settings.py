@@ -44,6 +44,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'finance_api.middleware.MetricsMiddleware', # First, so latency and DB metrics cover the whole stack
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware', # Needs to be high up, especially before CommonMiddleware
@@ -73,6 +74,8 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+# Production serves through ASGI (see entrypoint.sh) so the async Plaid views don't hold a worker while waiting on Plaid
+ASGI_APPLICATION = 'config.asgi.application'
 
 
 # Database
@@ -80,10 +83,23 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 DATABASE_URL = os.environ.get('DATABASE_URL')
 
+# Must match the server entrypoint.sh starts. Under ASGI, sync ORM work runs on a
+# fresh thread per request, so persistent connections are never reused or closed
+# and pile up until Postgres hits max_connections (Django ticket #33497).
+# Persistent connections are therefore only used under WSGI; put a pooler such
+# as PgBouncer in front of Postgres to pool connections under ASGI. PgBouncer's
+# transaction pooling can't keep a server-side cursor open across transactions,
+# so set DB_DISABLE_SERVER_SIDE_CURSORS=true behind it; queryset.iterator() then
+# loads its whole result set, so large scans page by primary key instead
+# (see finance_api.services.recategorize_transactions).
+FINANCE_SERVER_INTERFACE = os.environ.get('FINANCE_SERVER_INTERFACE', 'asgi')
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 600 if FINANCE_SERVER_INTERFACE == 'wsgi' else 0))
+
 if DATABASE_URL:
      DATABASES = {
-        'default': dj_database_url.config(default=DATABASE_URL, conn_max_age=600, ssl_require=os.environ.get('DB_SSL_REQUIRE', 'False').lower() in ('true', '1', 't'))
+        'default': dj_database_url.config(default=DATABASE_URL, conn_max_age=DB_CONN_MAX_AGE, ssl_require=os.environ.get('DB_SSL_REQUIRE', 'False').lower() in ('true', '1', 't'))
     }
+     DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = os.environ.get('DB_DISABLE_SERVER_SIDE_CURSORS', 'False').lower() in ('true', '1', 't')
 else:
     # Default fallback for local dev if DATABASE_URL not set
     DATABASES = {
@@ -202,6 +218,27 @@ CORS_ALLOW_CREDENTIALS = True # Allow cookies to be sent with requests (importan
 PLAID_CLIENT_ID = os.environ.get('PLAID_CLIENT_ID')
 PLAID_SECRET = os.environ.get('PLAID_SECRET')
 PLAID_ENV = os.environ.get('PLAID_ENV', 'sandbox')
+PLAID_HOST = os.environ.get('PLAID_HOST') # Optional override of the PLAID_ENV host (fake server for benchmarks)
+PLAID_TIMEOUT_SECONDS = float(os.environ.get('PLAID_TIMEOUT_SECONDS', 30))
+
+# AI core service (used for transaction categorization)
+AI_CORE_SERVICE_URL = os.environ.get('AI_CORE_SERVICE_URL', 'http://ai_core_service:8050')
+AI_CORE_TIMEOUT_SECONDS = float(os.environ.get('AI_CORE_TIMEOUT_SECONDS', 60))
+
+# Observability
+# /metrics is always exposed; per-request trace spans are opt-in and logged on 'finance_api.tracing'
+TRACING_ENABLED = os.environ.get('TRACING_ENABLED', 'False').lower() in ('true', '1', 't')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'finance_api': {'handlers': ['console'], 'level': os.environ.get('FINANCE_LOG_LEVEL', 'INFO')},
+    },
+}
 
 
 # Celery Configuration Example (Requires Celery setup)
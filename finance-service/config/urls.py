@@ -1,11 +1,16 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from finance_api.views import metrics_view
+
 urlpatterns = [
     # path('admin/', admin.site.urls), # Optional: Enable admin for this service if needed
     # Include the API endpoints from your finance_api app
     # Prefix with '/api/finance/' matching the gateway routing (or adjust gateway)
     path('api/finance/', include('finance_api.urls')),
 
+    # Prometheus scrape endpoint; not routed through the API gateway
+    path('metrics', metrics_view, name='metrics'),
+
     # Add other top-level URL patterns for this service if necessary
 ]
@@ -0,0 +1,13 @@
+"""
+WSGI config for the finance service.
+
+Kept as a fallback (FINANCE_SERVER_INTERFACE=wsgi in entrypoint.sh); async views
+still work under WSGI but each one occupies a worker for its full duration.
+"""
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+application = get_wsgi_application()
@@ -37,10 +37,27 @@ python manage.py migrate --noinput
 # echo "Collecting static files..."
 # python manage.py collectstatic --noinput --clear
 
+# Prometheus multiprocess mode: each Gunicorn worker writes metrics here and
+# /metrics aggregates them. Cleared on start so stale worker files don't linger;
+# gunicorn.conf.py's child_exit hook cleans up after workers that die mid-run.
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus_multiproc}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 # Start the Gunicorn server (or Django dev server for debug)
+# ASGI (Uvicorn workers) by default so the async Plaid views don't hold a worker
+# while waiting on Plaid; FINANCE_SERVER_INTERFACE=wsgi falls back to sync workers.
+# settings.py reads the same variable: under ASGI, Django's persistent DB connections
+# leak (one per request thread), so CONN_MAX_AGE defaults to 0 there. Use PgBouncer
+# (or another pooler) for connection reuse under ASGI; DB_CONN_MAX_AGE overrides.
+# In PgBouncer transaction pooling mode also set DB_DISABLE_SERVER_SIDE_CURSORS=true.
+export FINANCE_SERVER_INTERFACE="${FINANCE_SERVER_INTERFACE:-asgi}"
 echo "Starting Gunicorn server..."
 # exec runs the command replacing the shell process, which is good practice for the main container command
-exec gunicorn config.wsgi:application --bind 0.0.0.0:8002 --workers 3 --log-level info
+if [ "$FINANCE_SERVER_INTERFACE" = "wsgi" ]; then
+    exec gunicorn --config gunicorn.conf.py config.wsgi:application --bind 0.0.0.0:8002 --workers 3 --log-level info
+fi
+exec gunicorn --config gunicorn.conf.py config.asgi:application -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:8002 --workers 3 --log-level info
 
 # Alternatively, for development with DEBUG=True:
 # echo "Starting Django development server..."
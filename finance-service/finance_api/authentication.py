@@ -0,0 +1,38 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """
+    simplejwt's JWTAuthentication for async Django views (DRF views are sync-only).
+    Delegates to simplejwt's own authenticate() so header parsing, token and claim
+    validation, the user lookup and checks such as CHECK_REVOKE_TOKEN stay in step
+    with the library. The ORM lookup runs in a thread, as Django's async ORM does.
+    """
+
+    async def aauthenticate(self, request):
+        return await sync_to_async(self.authenticate)(request)
+
+
+async def authenticate_request(request):
+    """
+    Sets request.user from the Bearer token. Returns None on success, or the
+    401 JsonResponse to send (same body/header shape DRF's IsAuthenticated gives).
+    """
+    authenticator = AsyncJWTAuthentication()
+    try:
+        result = await authenticator.aauthenticate(request)
+    except AuthenticationFailed as e:
+        # Same body DRF's exception handler builds: dict/list details (simplejwt's
+        # InvalidToken carries code and messages) go out as-is
+        data = e.detail if isinstance(e.detail, (dict, list)) else {'detail': e.detail}
+        response = JsonResponse(data, status=401, safe=False)
+    else:
+        if result is not None:
+            request.user, request.auth = result
+            return None
+        response = JsonResponse({'detail': "Authentication credentials were not provided."}, status=401)
+    response['WWW-Authenticate'] = authenticator.authenticate_header(request)
+    return response
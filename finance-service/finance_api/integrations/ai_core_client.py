@@ -0,0 +1,64 @@
+import logging
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..tracing import outgoing_headers, start_span
+
+logger = logging.getLogger(__name__)
+
+
+class AICoreError(Exception):
+    """ Raised when ai-core-service cannot be reached or returns an error """
+
+
+class AICoreClient:
+    """
+    Thin client for ai-core-service. Reuses one requests.Session, so calls share
+    pooled keep-alive connections instead of paying a TCP handshake each time.
+    """
+
+    def __init__(self, base_url=None, timeout=None, pool_size=4):
+        self.base_url = (base_url or settings.AI_CORE_SERVICE_URL).rstrip('/')
+        self.timeout = timeout or settings.AI_CORE_TIMEOUT_SECONDS
+        self.session = requests.Session()
+        # Retry idempotent-in-practice inference calls on connection resets and 502/503/504
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET', 'POST']),
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _request(self, method, path, **kwargs):
+        url = f"{self.base_url}{path}"
+        with start_span(f'ai_core.{method.lower()} {path}'):
+            try:
+                response = self.session.request(method, url, headers=outgoing_headers(), timeout=self.timeout, **kwargs)
+                response.raise_for_status()
+                return response.json()
+            except requests.RequestException as e:
+                raise AICoreError(f"{method} {url} failed: {e}") from e
+
+    def get_model_version(self, model='category_classifier'):
+        """ Version of the model ai-core currently serves, or None if it is not loaded """
+        return self._request('GET', '/models').get(model, {}).get('version')
+
+    def categorize_batch(self, descriptions):
+        """
+        Categorizes descriptions in one call.
+        Returns (model_version, [(category, confidence), ...]) in input order.
+        """
+        payload = self._request('POST', '/categorize/transactions', json={'descriptions': descriptions})
+        results = [(r.get('suggested_category'), r.get('confidence')) for r in payload['results']]
+        if len(results) != len(descriptions):
+            raise AICoreError(f"Expected {len(descriptions)} results, got {len(results)}")
+        return payload.get('model_version'), results
+
+    def close(self):
+        self.session.close()
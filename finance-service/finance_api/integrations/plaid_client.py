@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import time
+
+from django.conf import settings
+import httpx
+import plaid
+
+from .. import metrics
+from ..tracing import start_span
+
+logger = logging.getLogger(__name__)
+
+# Plaid API version sent with every call (the one plaid-python 9.x pins), so
+# response shapes don't change under us when Plaid's account default moves
+PLAID_API_VERSION = '2020-09-14'
+
+
+# --- Plaid Configuration ---
+# Ensure PLAID_CLIENT_ID, PLAID_SECRET, PLAID_ENV are in settings
+
+def _plaid_host():
+    # PLAID_HOST overrides the environment, e.g. to point at benchmarks/fake_plaid.py
+    if getattr(settings, 'PLAID_HOST', None):
+        return settings.PLAID_HOST
+    if settings.PLAID_ENV == 'sandbox':
+        return plaid.Environment.Sandbox
+    elif settings.PLAID_ENV == 'development':
+        return plaid.Environment.Development
+    return plaid.Environment.Production
+
+
+# --- Async client ---
+# Used by the async Plaid views. Talks to Plaid's REST API over httpx so that a
+# slow Plaid response suspends a coroutine instead of holding a worker thread.
+
+class PlaidError(Exception):
+    """ A failed Plaid call; error_code is Plaid's code (or the HTTP status / 'client_error' / 'invalid_response') """
+
+    def __init__(self, error_code, status=None, body=None):
+        super().__init__(f"Plaid error {error_code} (status {status})")
+        self.error_code = error_code
+        self.status = status
+        self.body = body
+
+
+_async_client = None
+_async_client_loop = None
+
+
+def _new_async_client():
+    return httpx.AsyncClient(
+        base_url=_plaid_host(),
+        headers={'Plaid-Version': PLAID_API_VERSION},
+        timeout=settings.PLAID_TIMEOUT_SECONDS,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    )
+
+
+def _get_async_client():
+    """
+    Returns (client, is_shared). The shared keep-alive client is bound to the
+    first event loop that uses it (the ASGI server's loop). Calls from any other
+    loop, e.g. async_to_sync under WSGI, get a one-off client instead.
+    """
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client.is_closed:
+        _async_client, _async_client_loop = _new_async_client(), loop
+    if _async_client_loop is loop:
+        return _async_client, True
+    return _new_async_client(), False
+
+
+async def call_async(operation, path, payload):
+    """
+    POSTs `payload` (plus credentials) to Plaid's `path` and returns the decoded
+    JSON body. Records latency, Plaid error codes and a trace span.
+    Raises PlaidError on any failure.
+    """
+    http, shared = _get_async_client()
+    body = {'client_id': settings.PLAID_CLIENT_ID, 'secret': settings.PLAID_SECRET, **payload}
+    start = time.perf_counter()
+    with start_span(f'plaid.{operation}', operation=operation) as span:
+        try:
+            response = await http.post(path, json=body)
+        except httpx.HTTPError as e:
+            metrics.PLAID_ERRORS.labels(operation=operation, error_code='client_error').inc()
+            logger.warning("Plaid %s failed: %s", operation, e)
+            raise PlaidError('client_error') from e
+        finally:
+            metrics.PLAID_LATENCY.labels(operation=operation).observe(time.perf_counter() - start)
+            if not shared:
+                await http.aclose()
+
+        if response.status_code >= 400:
+            try:
+                error_code = response.json().get('error_code') or str(response.status_code)
+            except ValueError:
+                error_code = str(response.status_code)
+            metrics.PLAID_ERRORS.labels(operation=operation, error_code=error_code).inc()
+            if span is not None:
+                span.attributes['error_code'] = error_code
+            logger.warning("Plaid %s failed (%s): %s", operation, error_code, response.text)
+            raise PlaidError(error_code, response.status_code, response.text)
+        try:
+            return response.json()
+        except ValueError as e:
+            metrics.PLAID_ERRORS.labels(operation=operation, error_code='invalid_response').inc()
+            if span is not None:
+                span.attributes['error_code'] = 'invalid_response'
+            logger.warning("Plaid %s returned a non-JSON body: %.200s", operation, response.text)
+            raise PlaidError('invalid_response', response.status_code, response.text) from e
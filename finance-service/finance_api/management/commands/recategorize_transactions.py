@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from finance_api.integrations.ai_core_client import AICoreClient, AICoreError
+from finance_api.services import recategorize_transactions
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills Transaction.category for uncategorized transactions and for ones "
+        "categorized by an older AI model, using ai-core-service in large batches. "
+        "User-defined categories are never overwritten. Resumable: progress is "
+        "checkpointed per batch, so rerunning continues where the last run stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checkpoint', default='default', help="Checkpoint name; use separate names for independent runs.")
+        parser.add_argument('--batch-size', type=int, default=2000, help="Descriptions per ai-core request.")
+        parser.add_argument('--chunk-size', type=int, default=10000, help="Rows fetched per keyset-paginated query.")
+        parser.add_argument('--write-batch-size', type=int, default=1000, help="Rows per bulk_update statement.")
+        parser.add_argument('--in-flight', type=int, default=2, help="ai-core requests kept in flight ahead of DB writes.")
+        parser.add_argument('--limit', type=int, help="Stop after this many transactions (leaves the run resumable).")
+        parser.add_argument('--reset', action='store_true', help="Ignore the stored checkpoint and start from the beginning.")
+        parser.add_argument('--dry-run', action='store_true', help="Call ai-core but write nothing, checkpoint included.")
+        parser.add_argument('--ai-core-url', help="Override settings.AI_CORE_SERVICE_URL.")
+
+    def handle(self, *args, **options):
+        for name in ('batch_size', 'chunk_size', 'write_batch_size', 'in_flight'):
+            if options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be positive.")
+
+        client = AICoreClient(base_url=options['ai_core_url'], pool_size=options['in_flight'])
+
+        def progress(stats, elapsed):
+            rate = stats['processed'] / elapsed if elapsed else 0
+            self.stdout.write(
+                f"  processed {stats['processed']:,} updated {stats['updated']:,} ({rate:,.0f} rows/s)", ending='\r'
+            )
+            self.stdout.flush()
+
+        try:
+            stats = recategorize_transactions(
+                client,
+                checkpoint_name=options['checkpoint'],
+                batch_size=options['batch_size'],
+                chunk_size=options['chunk_size'],
+                write_batch_size=options['write_batch_size'],
+                in_flight=options['in_flight'],
+                limit=options['limit'],
+                reset=options['reset'],
+                dry_run=options['dry_run'],
+                progress=progress,
+            )
+        except AICoreError as e:
+            raise CommandError(f"Re-categorization stopped: {e}. Rerun to resume from the last checkpoint.")
+        finally:
+            client.close()
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f"Model {stats['model_version']}: processed {stats['processed']:,}, updated {stats['updated']:,} "
+            f"in {stats['elapsed_seconds']}s{' (dry run)' if options['dry_run'] else ''}."
+        ))
@@ -0,0 +1,167 @@
+import json
+import random
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction as db_transaction
+
+from finance_api.models import Account, Transaction
+
+# Merchant descriptions roughly shaped like real bank feeds; repeated heavily
+# so categorization caches and indexes see a realistic distribution.
+# (template, Plaid primary, Plaid detailed, app category)
+MERCHANTS = [
+    ("STARBUCKS STORE #{n}", "FOOD_AND_DRINK", "FOOD_AND_DRINK_COFFEE", "Dining"),
+    ("UBER *TRIP {n}", "TRANSPORTATION", "TRANSPORTATION_TAXIS_AND_RIDE_SHARES", "Travel"),
+    ("AMAZON MKTPLACE PMTS {n}", "GENERAL_MERCHANDISE", "GENERAL_MERCHANDISE_ONLINE_MARKETPLACES", "Shopping"),
+    ("SHELL OIL {n}", "TRANSPORTATION", "TRANSPORTATION_GAS", "Transportation"),
+    ("WHOLEFDS MKT {n}", "FOOD_AND_DRINK", "FOOD_AND_DRINK_GROCERIES", "Groceries"),
+    ("NETFLIX.COM", "ENTERTAINMENT", "ENTERTAINMENT_TV_AND_MOVIES", "Entertainment"),
+    ("SPOTIFY USA", "ENTERTAINMENT", "ENTERTAINMENT_MUSIC_AND_AUDIO", "Entertainment"),
+    ("COMCAST CABLE {n}", "RENT_AND_UTILITIES", "RENT_AND_UTILITIES_INTERNET_AND_CABLE", "Utilities"),
+    ("PAYROLL DEPOSIT ACME CORP", "INCOME", "INCOME_WAGES", "Income"),
+    ("CHIPOTLE {n}", "FOOD_AND_DRINK", "FOOD_AND_DRINK_FAST_FOOD", "Dining"),
+    ("TARGET T-{n}", "GENERAL_MERCHANDISE", "GENERAL_MERCHANDISE_SUPERSTORES", "Groceries"),
+    ("VENMO PAYMENT {n}", "TRANSFER_OUT", "TRANSFER_OUT_ACCOUNT_TRANSFER", "Transfers"),
+]
+
+
+def _uuid(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates deterministic synthetic users, accounts and transactions for "
+        "benchmarking (10k to 10M transaction rows). Optionally writes JWT access "
+        "tokens for the generated users so the load driver can authenticate."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transactions', type=int, default=10_000, help="Total transaction rows to create.")
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--accounts-per-user', type=int, default=2)
+        parser.add_argument('--days', type=int, default=365, help="Spread transaction dates over this many days.")
+        parser.add_argument('--batch-size', type=int, default=5_000, help="Rows per bulk_create call.")
+        parser.add_argument('--seed', type=int, default=42, help="RNG seed; same seed gives the same dataset.")
+        parser.add_argument('--prefix', default='bench', help="Username / Plaid id prefix for generated rows.")
+        parser.add_argument('--tokens-out', help="Write {username: access_token} JSON for generated users here.")
+        parser.add_argument('--clear', action='store_true', help="Delete previously generated rows with this prefix first.")
+
+    def handle(self, *args, **options):
+        if options['transactions'] < 1 or options['users'] < 1 or options['accounts_per_user'] < 1:
+            raise CommandError("--transactions, --users and --accounts-per-user must be positive.")
+
+        rng = random.Random(options['seed'])
+        prefix = options['prefix']
+        User = get_user_model()
+
+        if options['clear']:
+            deleted, _ = User.objects.filter(username__startswith=f"{prefix}_user_").delete()
+            self.stdout.write(f"Deleted {deleted} previously generated rows.")
+
+        started = time.perf_counter()
+        users = self._create_users(User, prefix, options['users'])
+        accounts = self._create_accounts(rng, prefix, users, options['accounts_per_user'])
+        created = self._create_transactions(rng, prefix, accounts, options)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(users)} users, {len(accounts)} accounts, {created} transactions "
+            f"in {elapsed:.1f}s ({created / elapsed:,.0f} rows/s)."
+        ))
+
+        if options['tokens_out']:
+            self._write_tokens(users, options['tokens_out'])
+
+    def _create_users(self, User, prefix, count):
+        usernames = [f"{prefix}_user_{i}" for i in range(count)]
+        existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        User.objects.bulk_create(
+            [User(username=name, email=f"{name}@example.com") for name in usernames if name not in existing],
+            batch_size=1_000,
+        )
+        return list(User.objects.filter(username__in=usernames).order_by('username'))
+
+    def _create_accounts(self, rng, prefix, users, per_user):
+        accounts = []
+        for user in users:
+            item_id = f"{prefix}-item-{user.pk}"
+            for n in range(per_user):
+                accounts.append(Account(
+                    id=_uuid(rng),
+                    user=user,
+                    # plaid_item_id is unique per Account row in this schema
+                    plaid_item_id=f"{item_id}-{n}",
+                    plaid_account_id=f"{prefix}-acc-{user.pk}-{n}",
+                    name=rng.choice(["Checking", "Savings", "Credit Card"]),
+                    mask=f"{rng.randint(0, 9999):04d}",
+                    account_type='depository',
+                    account_subtype=rng.choice(['checking', 'savings']),
+                    current_balance=Decimal(rng.randint(0, 5_000_000)) / 100,
+                    available_balance=Decimal(rng.randint(0, 5_000_000)) / 100,
+                ))
+        Account.objects.bulk_create(accounts, batch_size=1_000, ignore_conflicts=True)
+        # Re-read so reruns without --clear reference the rows that actually exist
+        return list(Account.objects.filter(user__in=users).order_by('plaid_account_id'))
+
+    def _create_transactions(self, rng, prefix, accounts, options):
+        total = options['transactions']
+        batch_size = options['batch_size']
+        today = date.today()
+        generated = 0
+        # ignore_conflicts skips rows left by an earlier run, so count what actually landed
+        existing = Transaction.objects.filter(plaid_transaction_id__startswith=f"{prefix}-tx-")
+        before = existing.count()
+
+        while generated < total:
+            batch = []
+            for i in range(generated, min(generated + batch_size, total)):
+                account = accounts[rng.randrange(len(accounts))]
+                template, primary, detailed, category = MERCHANTS[rng.randrange(len(MERCHANTS))]
+                description = template.format(n=rng.randint(100, 999))
+                is_income = primary == 'INCOME'
+                cents = rng.randint(100_000, 500_000) if is_income else -rng.randint(100, 25_000)
+                batch.append(Transaction(
+                    id=_uuid(rng),
+                    user_id=account.user_id,
+                    account_id=account.id,
+                    plaid_transaction_id=f"{prefix}-tx-{i}",
+                    amount=Decimal(cents) / 100,
+                    description=description,
+                    merchant_name=description.split(' ')[0].title(),
+                    # Seeded as an earlier AI pass, so category filters hit real rows and
+                    # recategorize_transactions sees them as stale
+                    category=category,
+                    category_source=Transaction.CATEGORY_SOURCE_AI,
+                    category_model_version=f"{prefix}-seed",
+                    plaid_category_primary=primary,
+                    plaid_category_detailed=detailed,
+                    date=today - timedelta(days=rng.randrange(options['days'])),
+                    payment_channel=rng.choice(['online', 'in store', 'other']),
+                    pending=rng.random() < 0.02,
+                ))
+            with db_transaction.atomic():
+                Transaction.objects.bulk_create(batch, batch_size=batch_size, ignore_conflicts=True)
+            generated += len(batch)
+            self.stdout.write(f"  {generated:,}/{total:,} transactions", ending='\r')
+            self.stdout.flush()
+
+        self.stdout.write('')
+        created = existing.count() - before
+        if created < generated:
+            self.stdout.write(f"Skipped {generated - created:,} transactions that already existed.")
+        return created
+
+    def _write_tokens(self, users, path):
+        # Imported lazily: only needed when the load driver will authenticate as these users
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        tokens = {user.username: str(AccessToken.for_user(user)) for user in users}
+        with open(path, 'w') as fh:
+            json.dump(tokens, fh, indent=2)
+        self.stdout.write(f"Wrote {len(tokens)} access tokens to {path}")
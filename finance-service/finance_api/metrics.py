@@ -0,0 +1,73 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+# --- Prometheus metrics for the finance service ---
+# Gunicorn runs several worker processes; when PROMETHEUS_MULTIPROC_DIR is set
+# (see entrypoint.sh) each worker writes its samples to that directory and the
+# /metrics view aggregates them. Without it, metrics are per-process.
+
+# Buckets tuned for API calls: most requests should sit well under a second,
+# Plaid calls occasionally take several seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+REQUEST_LATENCY = Histogram(
+    'finance_http_request_duration_seconds',
+    'Latency of HTTP requests handled by the finance service.',
+    ['method', 'route', 'status'],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'finance_http_requests_in_progress',
+    'HTTP requests currently being handled by this worker.',
+    multiprocess_mode='livesum',
+)
+
+DB_QUERIES_PER_REQUEST = Histogram(
+    'finance_db_queries_per_request',
+    'Number of database queries executed while serving a request.',
+    ['route'],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+DB_TIME_PER_REQUEST = Histogram(
+    'finance_db_query_duration_seconds_per_request',
+    'Total time spent in database queries while serving a request.',
+    ['route'],
+    buckets=LATENCY_BUCKETS,
+)
+
+PLAID_LATENCY = Histogram(
+    'finance_plaid_request_duration_seconds',
+    'Latency of outbound Plaid API calls.',
+    ['operation'],
+    buckets=LATENCY_BUCKETS,
+)
+PLAID_ERRORS = Counter(
+    'finance_plaid_errors_total',
+    'Failed Plaid API calls by operation and Plaid error code.',
+    ['operation', 'error_code'],
+)
+
+
+def get_registry():
+    """ Returns the registry to expose, aggregating worker files in multiprocess mode """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_latest():
+    """ Returns (body, content_type) in the Prometheus text exposition format """
+    return generate_latest(get_registry()), CONTENT_TYPE_LATEST
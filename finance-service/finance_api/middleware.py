@@ -0,0 +1,126 @@
+import contextvars
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db.backends.signals import connection_created
+
+from . import metrics
+from .tracing import start_span
+
+
+class QueryTimer:
+    """ Counts queries and accumulates their duration for one request """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+# The timer lives in a context variable rather than on a connection: under ASGI,
+# ORM calls run on a sync_to_async thread with its own connection, and asgiref
+# copies the request's context into that thread.
+_query_timer = contextvars.ContextVar('finance_query_timer', default=None)
+
+
+def _count_queries(execute, sql, params, many, context):
+    timer = _query_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timer.count += 1
+        timer.duration += time.perf_counter() - start
+
+
+def _install_query_counter(sender, connection, **kwargs):
+    if _count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_queries)
+
+
+connection_created.connect(_install_query_counter)
+
+
+def _route_label(request):
+    # Use the URL pattern rather than the raw path to keep label cardinality bounded
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.route or match.view_name or 'unmatched'
+
+
+class MetricsMiddleware:
+    """
+    Records per-route latency, DB query count/time and an optional trace span
+    for every request. Should be first in MIDDLEWARE so it times the full stack.
+    Works in both WSGI and ASGI stacks without forcing async views onto a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if request.path == '/metrics':
+            return self.get_response(request)
+
+        timer, token, start = self._begin()
+        status_code = 500
+        try:
+            with self._span(request) as span:
+                response = self.get_response(request)
+                status_code = response.status_code
+                self._annotate(request, response, span)
+            return response
+        finally:
+            self._finish(request, timer, token, start, status_code)
+
+    async def __acall__(self, request):
+        if request.path == '/metrics':
+            return await self.get_response(request)
+
+        timer, token, start = self._begin()
+        status_code = 500
+        try:
+            with self._span(request) as span:
+                response = await self.get_response(request)
+                status_code = response.status_code
+                self._annotate(request, response, span)
+            return response
+        finally:
+            self._finish(request, timer, token, start, status_code)
+
+    def _begin(self):
+        timer = QueryTimer()
+        token = _query_timer.set(timer)
+        metrics.REQUESTS_IN_PROGRESS.inc()
+        return timer, token, time.perf_counter()
+
+    def _span(self, request):
+        return start_span(
+            'http.request',
+            traceparent=request.headers.get('traceparent'),
+            method=request.method,
+            path=request.path,
+        )
+
+    def _annotate(self, request, response, span):
+        if span is not None:
+            span.attributes.update(route=_route_label(request), status=response.status_code)
+            response['traceparent'] = span.traceparent()
+
+    def _finish(self, request, timer, token, start, status_code):
+        _query_timer.reset(token)
+        metrics.REQUESTS_IN_PROGRESS.dec()
+        route = _route_label(request)
+        metrics.REQUEST_LATENCY.labels(
+            method=request.method, route=route, status=str(status_code)
+        ).observe(time.perf_counter() - start)
+        metrics.DB_QUERIES_PER_REQUEST.labels(route=route).observe(timer.count)
+        metrics.DB_TIME_PER_REQUEST.labels(route=route).observe(timer.duration)
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Account',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('plaid_item_id', models.CharField(help_text='Plaid Item ID', max_length=100, unique=True)),
+                ('plaid_account_id', models.CharField(help_text='Plaid Account ID', max_length=100, unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('official_name', models.CharField(blank=True, max_length=200, null=True)),
+                ('mask', models.CharField(blank=True, help_text='Last 4 digits', max_length=4, null=True)),
+                ('account_type', models.CharField(help_text='e.g., depository', max_length=50)),
+                ('account_subtype', models.CharField(help_text='e.g., checking, savings', max_length=50)),
+                ('current_balance', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('available_balance', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('currency_code', models.CharField(default='USD', max_length=3)),
+                ('last_sync_time', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='finance_accounts', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CategorizationCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('model_version', models.CharField(help_text='Model version the run is applying', max_length=64)),
+                ('last_transaction_id', models.UUIDField(blank=True, help_text='Highest primary key processed so far', null=True)),
+                ('processed', models.BigIntegerField(default=0)),
+                ('updated', models.BigIntegerField(default=0)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Transaction',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('plaid_transaction_id', models.CharField(help_text='Plaid Transaction ID', max_length=100, unique=True)),
+                ('amount', models.DecimalField(decimal_places=2, help_text='Positive for credits, negative for debits', max_digits=12)),
+                ('currency_code', models.CharField(default='USD', max_length=3)),
+                ('description', models.TextField(blank=True, help_text='Original description from bank', null=True)),
+                ('merchant_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('category', models.CharField(blank=True, help_text='Suggested or user-defined category', max_length=100, null=True)),
+                ('category_source', models.CharField(blank=True, choices=[('ai', 'AI suggested'), ('user', 'User defined')], help_text='Who set the category', max_length=10, null=True)),
+                ('category_model_version', models.CharField(blank=True, help_text='AI model version that suggested the category', max_length=64, null=True)),
+                ('plaid_category_primary', models.CharField(blank=True, help_text='Plaid primary category', max_length=100, null=True)),
+                ('plaid_category_detailed', models.CharField(blank=True, help_text='Plaid detailed category', max_length=100, null=True)),
+                ('date', models.DateField(help_text='Date the transaction occurred')),
+                ('datetime', models.DateTimeField(blank=True, help_text='Timestamp if available', null=True)),
+                ('authorized_date', models.DateField(blank=True, null=True)),
+                ('authorized_datetime', models.DateTimeField(blank=True, null=True)),
+                ('payment_channel', models.CharField(blank=True, max_length=50, null=True)),
+                ('pending', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to='finance_api.account')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='finance_transactions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date', '-created_at'],
+                'indexes': [models.Index(fields=['user', 'date'], name='finance_api_user_id_a3f48d_idx'), models.Index(fields=['account', 'date'], name='finance_api_account_de26dd_idx')],
+            },
+        ),
+    ]
@@ -25,6 +25,13 @@ class Account(models.Model):
 
 class Transaction(models.Model):
     """ Represents a single financial transaction """
+    CATEGORY_SOURCE_AI = 'ai'
+    CATEGORY_SOURCE_USER = 'user'
+    CATEGORY_SOURCE_CHOICES = [
+        (CATEGORY_SOURCE_AI, 'AI suggested'),
+        (CATEGORY_SOURCE_USER, 'User defined'), # Never overwritten by re-categorization
+    ]
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='finance_transactions')
     account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='transactions')
@@ -35,6 +42,8 @@ class Transaction(models.Model):
     description = models.TextField(null=True, blank=True, help_text="Original description from bank")
     merchant_name = models.CharField(max_length=255, null=True, blank=True)
     category = models.CharField(max_length=100, null=True, blank=True, help_text="Suggested or user-defined category") # AI can help refine
+    category_source = models.CharField(max_length=10, choices=CATEGORY_SOURCE_CHOICES, null=True, blank=True, help_text="Who set the category")
+    category_model_version = models.CharField(max_length=64, null=True, blank=True, help_text="AI model version that suggested the category")
     plaid_category_primary = models.CharField(max_length=100, null=True, blank=True, help_text="Plaid primary category")
     plaid_category_detailed = models.CharField(max_length=100, null=True, blank=True, help_text="Plaid detailed category")
 
@@ -61,6 +70,20 @@ class Transaction(models.Model):
     def __str__(self):
         return f"{self.date} - {self.description or self.merchant_name} ({self.amount})"
 
+class CategorizationCheckpoint(models.Model):
+    """ Progress of a bulk re-categorization run, so an interrupted backfill can resume """
+    name = models.CharField(max_length=100, unique=True)
+    model_version = models.CharField(max_length=64, help_text="Model version the run is applying")
+    last_transaction_id = models.UUIDField(null=True, blank=True, help_text="Highest primary key processed so far")
+    processed = models.BigIntegerField(default=0)
+    updated = models.BigIntegerField(default=0)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.model_version}) @ {self.last_transaction_id}"
+
 # --- Add other models as needed ---
 # class Budget(models.Model): ...
 # class FinancialGoal(models.Model): ...
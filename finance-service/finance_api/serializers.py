@@ -25,22 +25,25 @@ class TransactionSerializer(serializers.ModelSerializer):
         model = Transaction
         fields = [
             'id', 'account_id', 'plaid_transaction_id', 'amount', 'currency_code',
-            'description', 'merchant_name', 'category', 'plaid_category_primary',
+            'description', 'merchant_name', 'category', 'category_source', 'plaid_category_primary',
             'plaid_category_detailed', 'date', 'datetime', 'pending',
             'created_at', 'updated_at'
         ]
         # Most fields are read-only from Plaid, except potentially 'category' if user can edit it
         read_only_fields = [
              'id', 'account_id', 'plaid_transaction_id', 'amount', 'currency_code',
-             'description', 'merchant_name', 'plaid_category_primary', 'plaid_category_detailed',
+             'description', 'merchant_name', 'category_source', 'plaid_category_primary', 'plaid_category_detailed',
              'date', 'datetime', 'pending', 'created_at', 'updated_at'
         ]
 
-    # Add custom validation or update logic if user can modify fields like 'category'
-    # def update(self, instance, validated_data):
-    #     instance.category = validated_data.get('category', instance.category)
-    #     # Add more fields user can update
-    #     instance.save()
-    #     return instance
+    def update(self, instance, validated_data):
+        # A category set by the user is final: bulk re-categorization skips category_source='user'.
+        # That includes confirming the AI's suggestion unchanged, so don't compare with the old value.
+        if 'category' in validated_data:
+            instance.category = validated_data['category']
+            instance.category_source = Transaction.CATEGORY_SOURCE_USER
+            instance.category_model_version = None
+            instance.save(update_fields=['category', 'category_source', 'category_model_version', 'updated_at'])
+        return instance
 
 # --- Add serializers for other models (Budget, Goal, etc.) ---
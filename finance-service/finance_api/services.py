@@ -0,0 +1,181 @@
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import transaction as db_transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .integrations.ai_core_client import AICoreError
+from .models import CategorizationCheckpoint, Transaction
+
+logger = logging.getLogger(__name__)
+
+
+# --- Bulk re-categorization ---
+
+def recategorizable_transactions(model_version):
+    """
+    Transactions the AI may (re)categorize: uncategorized ones, and ones an
+    older model version categorized. User-defined categories are never included.
+    """
+    return Transaction.objects.exclude(category_source=Transaction.CATEGORY_SOURCE_USER).filter(
+        Q(category__isnull=True)
+        | Q(category='')
+        | (Q(category_source=Transaction.CATEGORY_SOURCE_AI) & ~Q(category_model_version=model_version))
+    )
+
+
+def _iter_rows(queryset, after, chunk_size, limit):
+    """
+    Yields (pk, description, merchant_name) in primary-key order, one keyset page
+    (`pk > last seen`) of `chunk_size` rows per query. Unlike iterator() this keeps
+    memory bounded without a server-side cursor, which PgBouncer's transaction
+    pooling rules out (DISABLE_SERVER_SIDE_CURSORS).
+    """
+    remaining = limit
+    while remaining is None or remaining > 0:
+        page = queryset.order_by('pk')
+        if after is not None:
+            page = page.filter(pk__gt=after)
+        size = chunk_size if remaining is None else min(chunk_size, remaining)
+        rows = list(page.values_list('pk', 'description', 'merchant_name')[:size])
+        yield from rows
+        if len(rows) < size:
+            return
+        after = rows[-1][0]
+        if remaining is not None:
+            remaining -= len(rows)
+
+
+def _iter_batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _categorize(client, batch):
+    """ Runs in the worker thread: HTTP only, no ORM access """
+    texts = [(description or merchant_name or '').strip() for _, description, merchant_name in batch]
+    to_send = [text for text in texts if text]
+    if not to_send:
+        return None, [(None, None)] * len(batch)
+    version, results = client.categorize_batch(to_send)
+    # Rows with nothing to categorize get no prediction and are left untouched
+    results = iter(results)
+    return version, [next(results) if text else (None, None) for text in texts]
+
+
+def _write_batch(batch, model_version, predictions, checkpoint, write_batch_size):
+    now = timezone.now()
+    updates = {
+        pk: Transaction(
+            pk=pk,
+            category=category,
+            category_source=Transaction.CATEGORY_SOURCE_AI,
+            category_model_version=model_version,
+            updated_at=now,
+        )
+        for (pk, _, _), (category, _) in zip(batch, predictions)
+        if category
+    }
+
+    with db_transaction.atomic():
+        # Re-check under row locks: a user may have edited a category since the rows were read
+        writable = set(
+            Transaction.objects.select_for_update()
+            .filter(pk__in=list(updates))
+            .exclude(category_source=Transaction.CATEGORY_SOURCE_USER)
+            .values_list('pk', flat=True)
+        )
+        Transaction.objects.bulk_update(
+            [obj for pk, obj in updates.items() if pk in writable],
+            ['category', 'category_source', 'category_model_version', 'updated_at'],
+            batch_size=write_batch_size,
+        )
+        if checkpoint is not None:
+            checkpoint.last_transaction_id = batch[-1][0]
+            checkpoint.processed += len(batch)
+            checkpoint.updated += len(writable)
+            checkpoint.save(update_fields=['last_transaction_id', 'processed', 'updated', 'updated_at'])
+    return len(writable)
+
+
+def recategorize_transactions(client, checkpoint_name='default', batch_size=2000, chunk_size=10000,
+                              write_batch_size=1000, in_flight=2, limit=None, reset=False, dry_run=False,
+                              progress=None):
+    """
+    Walks re-categorizable transactions in primary-key order, `chunk_size` rows
+    per keyset query, sends their descriptions to ai-core-service in batches
+    and writes the results back with bulk_update.
+
+    Progress is checkpointed after every batch under `checkpoint_name`, so a
+    rerun resumes after the last written primary key. A checkpoint recorded for
+    a different model version, a completed checkpoint, or `reset=True` starts
+    the walk over.
+
+    The walk is not append-only: primary keys are random UUIDs, so rows
+    inserted after (or during) a run mostly sort below the cursor. Resuming only
+    skips rows an interrupted run already covered; the next full run after a
+    completed one starts from the beginning and picks the new rows up.
+    Up to `in_flight` AI calls run ahead of the DB writes to overlap network and
+    database time. Returns a dict of run statistics.
+    """
+    model_version = client.get_model_version()
+    if not model_version:
+        raise AICoreError("ai-core-service has no category classifier loaded.")
+
+    checkpoint = None
+    if not dry_run:
+        checkpoint, _ = CategorizationCheckpoint.objects.get_or_create(
+            name=checkpoint_name, defaults={'model_version': model_version}
+        )
+        if reset or checkpoint.completed_at or checkpoint.model_version != model_version:
+            checkpoint.model_version = model_version
+            checkpoint.last_transaction_id = None
+            checkpoint.processed = checkpoint.updated = 0
+            checkpoint.completed_at = None
+            checkpoint.save()
+
+    after = checkpoint.last_transaction_id if checkpoint is not None else None
+    rows = _iter_rows(recategorizable_transactions(model_version), after, chunk_size, limit or None)
+
+    stats = {'model_version': model_version, 'processed': 0, 'updated': 0, 'batches': 0}
+    started = time.perf_counter()
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max(1, in_flight)) as pool:
+        batches = _iter_batches(rows, batch_size)
+        for batch in batches:
+            pending.append((batch, pool.submit(_categorize, client, batch)))
+            if len(pending) < in_flight:
+                continue
+            _drain_one(pending, stats, checkpoint, write_batch_size, dry_run, progress, started)
+        while pending:
+            _drain_one(pending, stats, checkpoint, write_batch_size, dry_run, progress, started)
+
+    if checkpoint is not None and not limit:
+        checkpoint.completed_at = timezone.now()
+        checkpoint.save(update_fields=['completed_at', 'updated_at'])
+    stats['elapsed_seconds'] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+def _drain_one(pending, stats, checkpoint, write_batch_size, dry_run, progress, started):
+    batch, future = pending.popleft()
+    version, predictions = future.result()
+    version = version or stats['model_version']
+    if version != stats['model_version']:
+        # The model was swapped mid-run; record the version that actually produced these results
+        logger.warning("ai-core model changed from %s to %s during re-categorization", stats['model_version'], version)
+    written = 0 if dry_run else _write_batch(batch, version, predictions, checkpoint, write_batch_size)
+    stats['processed'] += len(batch)
+    stats['updated'] += written
+    stats['batches'] += 1
+    if progress is not None:
+        progress(stats, time.perf_counter() - started)
@@ -0,0 +1,88 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from finance_api.integrations import plaid_client
+
+
+class PlaidViewTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(username='plaid_user')
+        self.auth = {'HTTP_AUTHORIZATION': f"Bearer {AccessToken.for_user(self.user)}"}
+        patcher = mock.patch.object(plaid_client, 'call_async', new=mock.AsyncMock())
+        self.call_async = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_link_token_requires_authentication(self):
+        response = self.client.post(reverse('create_link_token'))
+
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('WWW-Authenticate', response)
+        self.call_async.assert_not_called()
+
+    def test_link_token_rejects_invalid_token_like_drf(self):
+        bad_token = {'HTTP_AUTHORIZATION': 'Bearer not-a-jwt'}
+
+        response = self.client.post(reverse('create_link_token'), **bad_token)
+        drf_response = self.client.get(reverse('account-list'), **bad_token)
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'token_not_valid')
+        self.assertEqual(response.json(), drf_response.json())
+        self.assertEqual(response['WWW-Authenticate'], drf_response['WWW-Authenticate'])
+        self.call_async.assert_not_called()
+
+    def test_link_token_rejects_inactive_user(self):
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.post(reverse('create_link_token'), **self.auth)
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_link_token(self):
+        self.call_async.return_value = {'link_token': 'link-sandbox-123'}
+
+        response = self.client.post(reverse('create_link_token'), **self.auth)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'link_token': 'link-sandbox-123'})
+        operation, path, payload = self.call_async.call_args.args
+        self.assertEqual((operation, path), ('link_token_create', '/link/token/create'))
+        self.assertEqual(payload['user'], {'client_user_id': str(self.user.id)})
+
+    def test_link_token_plaid_error(self):
+        self.call_async.side_effect = plaid_client.PlaidError('INVALID_API_KEYS', 400)
+
+        response = self.client.post(reverse('create_link_token'), **self.auth)
+
+        self.assertEqual(response.status_code, 500)
+
+    def test_exchange_accepts_json_and_form_bodies(self):
+        self.call_async.return_value = {'access_token': 'access-1', 'item_id': 'item-1'}
+        url = reverse('exchange_public_token')
+
+        json_response = self.client.post(url, {'public_token': 'public-1'}, content_type='application/json', **self.auth)
+        form_response = self.client.post(url, {'public_token': 'public-2'}, **self.auth) # multipart, like a form post
+
+        self.assertEqual(json_response.status_code, 200)
+        self.assertEqual(form_response.status_code, 200)
+        tokens = [call.args[2]['public_token'] for call in self.call_async.call_args_list]
+        self.assertEqual(tokens, ['public-1', 'public-2'])
+
+    def test_exchange_requires_public_token(self):
+        response = self.client.post(reverse('exchange_public_token'), {}, content_type='application/json', **self.auth)
+
+        self.assertEqual(response.status_code, 400)
+        self.call_async.assert_not_called()
+
+    def test_exchange_rejects_unsupported_media_type(self):
+        response = self.client.post(
+            reverse('exchange_public_token'), 'public_token=x', content_type='text/plain', **self.auth
+        )
+
+        self.assertEqual(response.status_code, 415)
@@ -0,0 +1,185 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase
+
+from finance_api.models import Account, CategorizationCheckpoint, Transaction
+from finance_api.serializers import TransactionSerializer
+from finance_api.services import recategorize_transactions
+
+
+class FakeAICoreClient:
+    """ Stands in for AICoreClient: every description gets category '<prefix>-<version>' """
+
+    def __init__(self, version='v1', on_batch=None):
+        self.version = version
+        self.on_batch = on_batch
+        self.calls = []
+
+    def get_model_version(self):
+        return self.version
+
+    def categorize_batch(self, descriptions):
+        self.calls.append(list(descriptions))
+        if self.on_batch is not None:
+            self.on_batch(descriptions)
+        return self.version, [(f"cat-{self.version}", 0.9) for _ in descriptions]
+
+    def sent(self):
+        return [description for call in self.calls for description in call]
+
+
+class RecategorizationTestMixin:
+    def setUp(self):
+        self.user = get_user_model().objects.create(username='recat_user')
+        self.account = Account.objects.create(
+            user=self.user, plaid_item_id='item-1', plaid_account_id='acc-1',
+            name='Checking', account_type='depository', account_subtype='checking',
+        )
+
+    def make_transactions(self, count, start=0, **fields):
+        return [
+            Transaction.objects.create(
+                user=self.user, account=self.account, plaid_transaction_id=f"tx-{i}",
+                amount=Decimal('-1.00'), description=f"merchant {i}", date=date(2024, 1, 1), **fields
+            )
+            for i in range(start, start + count)
+        ]
+
+    def run_recategorization(self, client, **kwargs):
+        kwargs.setdefault('batch_size', 3)
+        kwargs.setdefault('in_flight', 1)
+        return recategorize_transactions(client, checkpoint_name='test', **kwargs)
+
+
+class RecategorizeTransactionsTests(RecategorizationTestMixin, TestCase):
+
+    def test_categorizes_uncategorized_and_stale_rows_but_not_user_rows(self):
+        uncategorized = self.make_transactions(2)
+        stale = self.make_transactions(2, start=2, category='old', category_source='ai', category_model_version='v0')
+        user_defined = self.make_transactions(2, start=4, category='Mine', category_source='user')
+
+        stats = self.run_recategorization(FakeAICoreClient('v1'))
+
+        self.assertEqual(stats['updated'], 4)
+        for tx in uncategorized + stale:
+            tx.refresh_from_db()
+            self.assertEqual((tx.category, tx.category_source, tx.category_model_version), ('cat-v1', 'ai', 'v1'))
+        for tx in user_defined:
+            tx.refresh_from_db()
+            self.assertEqual((tx.category, tx.category_source), ('Mine', 'user'))
+
+    def test_rows_already_on_current_version_are_skipped(self):
+        self.make_transactions(3, category='cat-v1', category_source='ai', category_model_version='v1')
+        client = FakeAICoreClient('v1')
+
+        stats = self.run_recategorization(client)
+
+        self.assertEqual(stats['processed'], 0)
+        self.assertEqual(client.calls, [])
+
+    def test_rerun_resumes_from_checkpoint(self):
+        self.make_transactions(7)
+        first = FakeAICoreClient('v1')
+        self.run_recategorization(first, limit=3)
+
+        checkpoint = CategorizationCheckpoint.objects.get(name='test')
+        self.assertIsNone(checkpoint.completed_at)
+        self.assertEqual(checkpoint.processed, 3)
+
+        second = FakeAICoreClient('v1')
+        stats = self.run_recategorization(second)
+
+        self.assertEqual(stats['processed'], 4)
+        self.assertEqual(set(first.sent()) & set(second.sent()), set())
+        self.assertFalse(Transaction.objects.filter(category__isnull=True).exists())
+        checkpoint.refresh_from_db()
+        self.assertIsNotNone(checkpoint.completed_at)
+
+    def test_model_version_change_restarts_the_walk(self):
+        self.make_transactions(6)
+        self.run_recategorization(FakeAICoreClient('v1'), limit=3)
+
+        client = FakeAICoreClient('v2')
+        stats = self.run_recategorization(client)
+
+        self.assertEqual(stats['processed'], 6)
+        self.assertEqual(len(client.sent()), 6)
+        checkpoint = CategorizationCheckpoint.objects.get(name='test')
+        self.assertEqual((checkpoint.model_version, checkpoint.processed), ('v2', 6))
+        self.assertEqual(Transaction.objects.filter(category_model_version='v2').count(), 6)
+
+    def test_completed_run_picks_up_rows_added_below_the_cursor(self):
+        self.make_transactions(4)
+        self.run_recategorization(FakeAICoreClient('v1'))
+        cursor = CategorizationCheckpoint.objects.get(name='test').last_transaction_id
+
+        # Primary keys are random UUIDs, so new rows can sort before the old cursor
+        low = Transaction.objects.create(
+            id=uuid.UUID(int=1), user=self.user, account=self.account, plaid_transaction_id='tx-low',
+            amount=Decimal('-1.00'), description='late arrival', date=date(2024, 1, 2),
+        )
+        self.assertLess(low.pk, cursor)
+
+        client = FakeAICoreClient('v1')
+        self.run_recategorization(client)
+
+        self.assertEqual(client.sent(), ['late arrival'])
+        low.refresh_from_db()
+        self.assertEqual(low.category, 'cat-v1')
+
+    def test_pages_through_rows_by_primary_key(self):
+        self.make_transactions(7)
+        client = FakeAICoreClient('v1')
+
+        stats = self.run_recategorization(client, chunk_size=2, limit=5)
+        stats_rest = self.run_recategorization(client, chunk_size=2)
+
+        self.assertEqual((stats['processed'], stats_rest['processed']), (5, 2))
+        ordered = list(Transaction.objects.order_by('pk').values_list('description', flat=True))
+        self.assertEqual(client.sent(), ordered)
+
+    def test_dry_run_writes_nothing(self):
+        self.make_transactions(3)
+
+        stats = self.run_recategorization(FakeAICoreClient('v1'), dry_run=True)
+
+        self.assertEqual((stats['processed'], stats['updated']), (3, 0))
+        self.assertFalse(Transaction.objects.filter(category__isnull=False).exists())
+        self.assertFalse(CategorizationCheckpoint.objects.exists())
+
+
+class RecategorizationConcurrentEditTests(RecategorizationTestMixin, TransactionTestCase):
+    """ AI calls run on a worker thread, so the edit has to be committed for the writer to see it """
+
+    def test_user_edit_between_read_and_write_is_kept(self):
+        edited, untouched = self.make_transactions(2)
+
+        def user_edits_category(descriptions):
+            # Runs after the rows were read and before the results are written back
+            Transaction.objects.filter(pk=edited.pk).update(category='Mine', category_source='user')
+
+        self.run_recategorization(FakeAICoreClient('v1', on_batch=user_edits_category))
+
+        edited.refresh_from_db()
+        untouched.refresh_from_db()
+        self.assertEqual((edited.category, edited.category_source), ('Mine', 'user'))
+        self.assertEqual(untouched.category, 'cat-v1')
+
+
+class TransactionSerializerCategoryTests(RecategorizationTestMixin, TestCase):
+
+    def test_confirming_the_ai_category_marks_it_user_defined(self):
+        tx, = self.make_transactions(1, category='cat-v1', category_source='ai', category_model_version='v1')
+
+        serializer = TransactionSerializer(tx, data={'category': 'cat-v1'}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+
+        tx.refresh_from_db()
+        self.assertEqual((tx.category, tx.category_source, tx.category_model_version), ('cat-v1', 'user', None))
+
+        stats = self.run_recategorization(FakeAICoreClient('v2'))
+        self.assertEqual(stats['processed'], 0)
@@ -0,0 +1,97 @@
+import contextvars
+import json
+import logging
+import secrets
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger('finance_api.tracing')
+
+# --- Lightweight request tracing ---
+# Spans follow the W3C Trace Context format so that a finance request and the
+# ai-core calls it makes share one trace id. Finished spans are emitted as JSON
+# log lines on the 'finance_api.tracing' logger; ship them to whatever log
+# pipeline is in use. Disabled unless TRACING_ENABLED is set.
+
+TRACEPARENT_HEADER = 'traceparent'
+
+_current_span = contextvars.ContextVar('finance_current_span', default=None)
+
+
+class Span:
+    """ A single timed unit of work within a trace """
+
+    def __init__(self, name, trace_id, parent_id=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self._start = time.perf_counter()
+        self._start_wall = time.time()
+
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def finish(self):
+        duration_ms = (time.perf_counter() - self._start) * 1000
+        logger.info(json.dumps({
+            'service': 'finance-service',
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self._start_wall,
+            'duration_ms': round(duration_ms, 3),
+            'attributes': self.attributes,
+        }, default=str))
+
+
+def tracing_enabled():
+    return getattr(settings, 'TRACING_ENABLED', False)
+
+
+def parse_traceparent(value):
+    """ Returns (trace_id, parent_span_id) from a traceparent header, or (None, None) """
+    if not value:
+        return None, None
+    parts = value.strip().split('-')
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None, None
+    return parts[1], parts[2]
+
+
+@contextmanager
+def start_span(name, traceparent=None, **attributes):
+    """
+    Opens a span as a child of the current span (or of an incoming traceparent
+    header). Yields None when tracing is disabled so callers need no branching.
+    """
+    if not tracing_enabled():
+        yield None
+        return
+
+    parent = _current_span.get()
+    if parent is not None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    else:
+        trace_id, parent_id = parse_traceparent(traceparent)
+        trace_id = trace_id or secrets.token_hex(16)
+
+    span = Span(name, trace_id, parent_id, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    finally:
+        _current_span.reset(token)
+        span.finish()
+
+
+def outgoing_headers():
+    """ Headers to attach to downstream HTTP calls (e.g. ai-core) to continue the trace """
+    span = _current_span.get()
+    if span is None:
+        return {}
+    return {TRACEPARENT_HEADER: span.traceparent()}
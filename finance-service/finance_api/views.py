@@ -1,86 +1,104 @@
-from rest_framework import viewsets, permissions, status, generics
-from rest_framework.response import Response
-from rest_framework.decorators import action
-from django.conf import settings
-import plaid
-from plaid.api import plaid_api
-from plaid.model.link_token_create_request import LinkTokenCreateRequest
-from plaid.model.link_token_create_request_user import LinkTokenCreateRequestUser
-from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
-from plaid.model.transactions_sync_request import TransactionsSyncRequest
-from plaid.model.country_code import CountryCode
-from plaid.model.products import Products
+import json
+import logging
 
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from django.http import HttpResponse, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from . import metrics
+from .authentication import authenticate_request
+from .integrations import plaid_client
 from .models import Account, Transaction
 from .serializers import AccountSerializer, TransactionSerializer # Add other serializers
 # from .tasks import sync_account_transactions_task # Import Celery task
 
-
-# --- Plaid Configuration ---
-# Ensure PLAID_CLIENT_ID, PLAID_SECRET, PLAID_ENV are in settings
-PLAID_CLIENT_ID = settings.PLAID_CLIENT_ID
-PLAID_SECRET = settings.PLAID_SECRET
-
-if settings.PLAID_ENV == 'sandbox':
-    plaid_host = plaid.Environment.Sandbox
-elif settings.PLAID_ENV == 'development':
-    plaid_host = plaid.Environment.Development
-else:
-    plaid_host = plaid.Environment.Production
-
-plaid_configuration = plaid.Configuration(
-    host=plaid_host,
-    api_key={
-        'clientId': PLAID_CLIENT_ID,
-        'secret': PLAID_SECRET,
-    }
-)
-plaid_api_client = plaid.ApiClient(plaid_configuration)
-client = plaid_api.PlaidApi(plaid_api_client)
+logger = logging.getLogger(__name__)
 
 
 # --- Plaid Views ---
-
-class CreateLinkTokenView(generics.GenericAPIView):
+# These are async Django views rather than DRF views (DRF has no async support):
+# under ASGI a slow Plaid call suspends the coroutine instead of tying up a
+# worker, so the read-only endpoints below keep serving. JWT auth mirrors DRF's
+# IsAuthenticated; CSRF is exempt as with DRF's token-authenticated APIViews.
+
+FORM_CONTENT_TYPES = ('application/x-www-form-urlencoded', 'multipart/form-data')
+
+
+def _request_data(request):
+    """
+    Parses the body like DRF's default parsers did for these views (JSON, form or
+    multipart). Returns (data, None), or (None, error_response) with DRF's statuses.
+    """
+    if request.content_type in FORM_CONTENT_TYPES:
+        return request.POST, None
+    if not request.body:
+        return {}, None
+    if request.content_type != 'application/json':
+        return None, JsonResponse(
+            {"detail": f'Unsupported media type "{request.content_type}" in request.'},
+            status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        )
+    try:
+        data = json.loads(request.body)
+    except ValueError as e:
+        return None, JsonResponse({"detail": f"JSON parse error - {e}"}, status=status.HTTP_400_BAD_REQUEST)
+    if not isinstance(data, dict):
+        return None, JsonResponse({"error": "Request body must be a JSON object."}, status=status.HTTP_400_BAD_REQUEST)
+    return data, None
+
+@method_decorator(csrf_exempt, name='dispatch')
+class CreateLinkTokenView(View):
     """ Creates a Plaid Link token for the frontend to initialize Plaid Link """
-    permission_classes = [permissions.IsAuthenticated]
+    http_method_names = ['post', 'options']
+
+    async def post(self, request, *args, **kwargs):
+        auth_error = await authenticate_request(request)
+        if auth_error is not None:
+            return auth_error
 
-    def post(self, request, *args, **kwargs):
         try:
-            plaid_request = LinkTokenCreateRequest(
-                user=LinkTokenCreateRequestUser(
-                    client_user_id=str(request.user.id) # Use internal user ID
-                ),
-                client_name="Multifaceted AI App",
-                products=[Products("transactions")], # Or auth, identity, etc.
-                country_codes=[CountryCode('US')], # Or CA, GB, ES, FR, IE, NL
-                language='en',
-                # redirect_uri='YOUR_OAUTH_REDIRECT_URI', # Optional for OAuth flows
-                # webhook='YOUR_WEBHOOK_URL' # Optional: Highly recommended for real-time updates
-            )
-            response = client.link_token_create(plaid_request)
-            return Response({'link_token': response['link_token']})
-        except plaid.ApiException as e:
-            # Log the error details
-            print(f"Plaid API Exception: {e.body}")
-            return Response({"error": "Could not create Plaid link token."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        except Exception as e:
-            print(f"Error creating link token: {e}")
-            return Response({"error": "An internal error occurred."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-
-class ExchangePublicTokenView(generics.GenericAPIView):
+            response = await plaid_client.call_async('link_token_create', '/link/token/create', {
+                'user': {'client_user_id': str(request.user.id)}, # Use internal user ID
+                'client_name': "Multifaceted AI App",
+                'products': ['transactions'], # Or auth, identity, etc.
+                'country_codes': ['US'], # Or CA, GB, ES, FR, IE, NL
+                'language': 'en',
+                # 'redirect_uri': 'YOUR_OAUTH_REDIRECT_URI', # Optional for OAuth flows
+                # 'webhook': 'YOUR_WEBHOOK_URL' # Optional: Highly recommended for real-time updates
+            })
+            return JsonResponse({'link_token': response['link_token']})
+        except plaid_client.PlaidError:
+            # Error code and body are logged and counted by plaid_client.call_async
+            return JsonResponse({"error": "Could not create Plaid link token."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        except Exception:
+            logger.exception("Error creating link token")
+            return JsonResponse({"error": "An internal error occurred."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class ExchangePublicTokenView(View):
     """ Exchanges a Plaid public token (from frontend) for an access token and item ID """
-    permission_classes = [permissions.IsAuthenticated]
+    http_method_names = ['post', 'options']
 
-    def post(self, request, *args, **kwargs):
-        public_token = request.data.get('public_token')
+    async def post(self, request, *args, **kwargs):
+        auth_error = await authenticate_request(request)
+        if auth_error is not None:
+            return auth_error
+
+        data, parse_error = _request_data(request)
+        if parse_error is not None:
+            return parse_error
+        public_token = data.get('public_token')
         if not public_token:
-            return Response({"error": "Public token is required."}, status=status.HTTP_400_BAD_REQUEST)
+            return JsonResponse({"error": "Public token is required."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            exchange_request = ItemPublicTokenExchangeRequest(public_token=public_token)
-            exchange_response = client.item_public_token_exchange(exchange_request)
+            exchange_response = await plaid_client.call_async(
+                'item_public_token_exchange', '/item/public_token/exchange', {'public_token': public_token}
+            )
             access_token = exchange_response['access_token']
             item_id = exchange_response['item_id']
 
@@ -89,15 +107,15 @@ class ExchangePublicTokenView(generics.GenericAPIView):
             # Store it securely, perhaps in a separate encrypted model or use a secrets manager.
             # For this example, we won't store it directly on the Account model shown.
             # You would need a secure way to retrieve it when syncing.
-            print(f"Received Item ID: {item_id}, Access Token: [REDACTED]")
+            logger.info("Received Item ID: %s, Access Token: [REDACTED]", item_id)
             # TODO: Store item_id and access_token securely, associated with the request.user
             # Placeholder: Assume you have a secure way to store/retrieve access_token based on item_id
 
             # TODO: Fetch initial account details using the new access_token and create Account records
-            # Example (needs error handling and secure token storage):
-            # accounts_response = client.accounts_get(ItemGetRequest(access_token=access_token))
+            # Example (needs error handling and secure token storage; uses the async ORM):
+            # accounts_response = await plaid_client.call_async('accounts_get', '/accounts/get', {'access_token': access_token})
             # for acc_data in accounts_response['accounts']:
-            #     Account.objects.update_or_create(
+            #     await Account.objects.aupdate_or_create(
             #         plaid_account_id=acc_data['account_id'],
             #         defaults={
             #             'user': request.user,
@@ -110,14 +128,13 @@ class ExchangePublicTokenView(generics.GenericAPIView):
             # TODO: Trigger initial transaction sync (maybe async)
             # sync_account_transactions_task.delay(item_id)
 
-            return Response({"message": "Public token exchanged successfully. Accounts are being synced."}, status=status.HTTP_200_OK)
+            return JsonResponse({"message": "Public token exchanged successfully. Accounts are being synced."}, status=status.HTTP_200_OK)
 
-        except plaid.ApiException as e:
-            print(f"Plaid API Exception: {e.body}")
-            return Response({"error": "Could not exchange public token."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        except Exception as e:
-            print(f"Error exchanging token: {e}")
-            return Response({"error": "An internal error occurred."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        except plaid_client.PlaidError:
+            return JsonResponse({"error": "Could not exchange public token."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        except Exception:
+            logger.exception("Error exchanging token")
+            return JsonResponse({"error": "An internal error occurred."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 # --- Application Data Views ---
@@ -184,3 +201,11 @@ class TransactionViewSet(viewsets.ReadOnlyModelViewSet): # ReadOnly initially
     #     return Response(serializer.data)
 
 # --- Add ViewSets for Budget, Goal, etc. ---
+
+
+# --- Operational Views ---
+
+def metrics_view(request):
+    """ Exposes service metrics in the Prometheus text format (scraped internally, not via the gateway) """
+    body, content_type = metrics.render_latest()
+    return HttpResponse(body, content_type=content_type)
@@ -0,0 +1,8 @@
+# Gunicorn settings shared by the WSGI and ASGI launch commands in entrypoint.sh
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    # Drop a dead worker's live gauges (in-progress requests etc.) from the
+    # PROMETHEUS_MULTIPROC_DIR aggregate; restarted workers get a new pid.
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,14 +1,75 @@
-import joblib
+import logging
 import os
+import time
 from typing import List, Dict, Any, Tuple, Optional
 
+from .metrics import (
+    INFERENCE_ERRORS,
+    INFERENCE_SECONDS,
+    MODEL_LOADED,
+    batch_size_bucket,
+)
+from .model_registry import ModelRegistry
+from .tracing import start_span
+from .utils import LRUCache
+
+logger = logging.getLogger(__name__)
+
 # --- Placeholder Paths (Adjust as needed, consider using environment variables) ---
-MODEL_DIR = os.path.dirname(__file__) + '/models'
-FINANCE_MODEL_PATH = os.path.join(MODEL_DIR, 'finance', 'category_classifier.joblib')
+# With several ai-core pods, point MODEL_DIR (or at least FINANCE_MODEL_MANIFEST) at a shared
+# volume so the model management endpoints reach every pod, not just the one that was called
+MODEL_DIR = os.environ.get("MODEL_DIR", os.path.dirname(__file__) + '/models')
+FINANCE_MODEL_ARTIFACT = os.path.join('finance', 'category_classifier.joblib') # Relative to MODEL_DIR
+FINANCE_MODEL_PATH = os.path.join(MODEL_DIR, FINANCE_MODEL_ARTIFACT)
+# Optional manifest selecting the active/candidate artifact versions (see model_registry.py)
+FINANCE_MODEL_MANIFEST = os.environ.get(
+    "FINANCE_MODEL_MANIFEST", os.path.join(MODEL_DIR, 'finance', 'category_classifier.manifest.json')
+)
+# How often each worker checks the manifest for a new version (seconds, 0 disables)
+MODEL_WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", 10))
 # Add paths for other models...
 
-# --- Placeholder for loaded models (Load on startup or first use) ---
-category_classifier = None
+# Transaction descriptions repeat heavily (same merchants every month), so
+# categorization results are cached by (model version, normalized text).
+CATEGORY_CACHE_SIZE = int(os.environ.get("CATEGORY_CACHE_SIZE", 100_000))
+category_cache = LRUCache("category_classifier", CATEGORY_CACHE_SIZE)
+
+# Upper bound on descriptions per batch request, to keep a single call's latency and memory bounded
+MAX_CATEGORIZE_BATCH = int(os.environ.get("MAX_CATEGORIZE_BATCH", 5_000))
+
+# Sample batch every new classifier version must score before it serves traffic
+CATEGORY_WARMUP_DESCRIPTIONS = [
+    "starbucks store #1234", "uber *trip", "amazon mktplace pmts", "shell oil 5521",
+    "wholefds mkt 102", "netflix.com", "payroll deposit acme corp", "venmo payment",
+] * 4
+
+
+def _predict_categories(model: Any, texts: List[str]) -> List[Tuple[Optional[str], Optional[float]]]:
+    """ Runs a classifier once over a batch of already preprocessed texts """
+    # The input format depends entirely on how your model was trained (e.g., TF-IDF vector, embedding)
+    # This assumes the model takes the raw text string directly after preprocessing
+    if hasattr(model, "predict_proba") and hasattr(model, "classes_"):
+        # One pass: take the most probable class and its probability as the confidence
+        probabilities = model.predict_proba(texts)
+        results = []
+        for row in probabilities:
+            best = max(range(len(row)), key=row.__getitem__)
+            results.append((str(model.classes_[best]), float(row[best])))
+        return results
+
+    predictions = model.predict(texts)
+    return [(str(prediction), None) for prediction in predictions]
+
+
+# --- Loaded models (Load on startup; swapped in the background afterwards) ---
+category_registry = ModelRegistry(
+    "category_classifier",
+    model_dir=MODEL_DIR,
+    default_artifact=FINANCE_MODEL_ARTIFACT,
+    predict_fn=_predict_categories,
+    warmup_inputs=CATEGORY_WARMUP_DESCRIPTIONS,
+    manifest_path=FINANCE_MODEL_MANIFEST,
+)
 # other_finance_model = None
 # recipe_recommender = None
 # intent_recognizer = None
@@ -16,18 +77,25 @@ category_classifier = None
 # --- Functions to Load Models (Call from main.py startup event) ---
 
 def load_finance_models():
-    global category_classifier
-    print(f"Attempting to load finance model from: {FINANCE_MODEL_PATH}")
-    if os.path.exists(FINANCE_MODEL_PATH):
-        try:
-            category_classifier = joblib.load(FINANCE_MODEL_PATH)
-            print("Finance category classifier loaded successfully.")
-        except Exception as e:
-            print(f"Error loading finance model: {e}")
-            category_classifier = None # Ensure it's None if loading fails
-    else:
-        print(f"Finance model file not found at {FINANCE_MODEL_PATH}")
-        category_classifier = None
+    """ Loads the active classifier synchronously, then follows the manifest in the background """
+    manifest = category_registry.read_manifest() or {}
+    active = manifest.get("active") or {}
+    artifact = active.get("artifact", FINANCE_MODEL_ARTIFACT)
+    version = active.get("version") if active else os.environ.get("FINANCE_MODEL_VERSION")
+    logger.info("Attempting to load finance model from: %s", os.path.join(MODEL_DIR, artifact))
+
+    if category_registry.load_active(artifact, version) is None:
+        MODEL_LOADED.labels(model="category_classifier").set(0)
+    # Candidate (shadow) versions load in the background; later manifest updates are picked up by the watcher
+    category_registry.sync(manifest)
+    category_registry.start_watching(MODEL_WATCH_INTERVAL)
+
+
+def get_model_info() -> Dict[str, Dict[str, Any]]:
+    """ Loaded state and versions of each model, for the /models endpoint """
+    return {
+        "category_classifier": category_registry.info(),
+    }
 
 # --- Add loading functions for other model types ---
 # def load_assistant_models(): ...
@@ -39,7 +107,7 @@ def analyze_financial_data(user_id: str, transactions: List[Dict], requested_ins
     Placeholder function for financial analysis.
     Replace with actual logic using loaded models and data analysis techniques.
     """
-    print(f"Analyzing {len(transactions)} transactions for user {user_id} requesting {requested_insights}")
+    logger.debug("Analyzing %d transactions for user %s requesting %s", len(transactions), user_id, requested_insights)
     # TODO: Implement actual analysis (spending patterns, savings suggestions, etc.)
     # This might involve pandas DataFrames, ML models, or rule-based systems.
     insights = {}
@@ -62,48 +130,81 @@ def analyze_financial_data(user_id: str, transactions: List[Dict], requested_ins
 
     return insights
 
-def categorize_transaction_text(description: str) -> Tuple[Optional[str], Optional[float]]:
-    """
-    Placeholder for categorizing transaction using a loaded model.
-    """
-    global category_classifier
-    if category_classifier is None:
-        print("Warning: Category classifier model not loaded. Returning None.")
-        # Attempt to load on first use (less ideal than startup loading)
-        load_finance_models()
-        if category_classifier is None:
-            return None, None
-
-    try:
-        # TODO: Preprocess the description text as required by your model
-        processed_text = description.lower() # Simple example
+def _preprocess_description(description: str) -> str:
+    # TODO: Preprocess the description text as required by your model
+    return description.lower() # Simple example
 
-        # Make prediction
-        # The input format depends entirely on how your model was trained (e.g., TF-IDF vector, embedding)
-        # This assumes the model takes the raw text string directly after preprocessing
-        prediction = category_classifier.predict([processed_text])[0]
 
-        # Get confidence score if the model supports it (e.g., predict_proba)
-        confidence = None
-        if hasattr(category_classifier, "predict_proba"):
-             probabilities = category_classifier.predict_proba([processed_text])[0]
-             confidence = max(probabilities) # Get probability of the chosen class
+def _same_category(primary: Tuple[Optional[str], Optional[float]], shadow: Tuple[Optional[str], Optional[float]]) -> bool:
+    return primary[0] == shadow[0]
 
-        return str(prediction), float(confidence) if confidence is not None else None
 
-    except Exception as e:
-        print(f"Error during categorization inference: {e}")
-        return None, None
+def categorize_transactions_batch(descriptions: List[str]) -> Tuple[Optional[str], List[Tuple[Optional[str], Optional[float]]]]:
+    """
+    Categorizes many descriptions with a single model call. Duplicate and
+    previously seen descriptions are served from the cache.
+    Returns (model_version, [(category, confidence), ...]) in input order.
+    """
+    loaded = category_registry.active # One snapshot per request: a concurrent swap can't mix versions
+    if loaded is None:
+        # Loaded at startup and swapped by the manifest watcher; never joblib.load on the request path
+        logger.warning("Category classifier model not loaded.")
+        return None, [(None, None)] * len(descriptions)
+
+    texts = [_preprocess_description(description or "") for description in descriptions]
+    unique_texts = list(dict.fromkeys(texts)) # Unique, order-preserving
+    results: Dict[str, Tuple[Optional[str], Optional[float]]] = {}
+    misses = []
+    for text in unique_texts:
+        cached = category_cache.get((loaded.version, text))
+        if cached is not None:
+            results[text] = cached
+        else:
+            misses.append(text)
+
+    if misses:
+        start = time.perf_counter()
+        try:
+            with start_span("inference.categorize", model="category_classifier",
+                            model_version=loaded.version, batch_size=len(misses)):
+                predictions = _predict_categories(loaded.model, misses)
+        except Exception:
+            INFERENCE_ERRORS.labels(model="category_classifier").inc()
+            logger.exception("Error during categorization inference")
+            raise
+        INFERENCE_SECONDS.labels(
+            model="category_classifier", batch_size=batch_size_bucket(len(misses))
+        ).observe(time.perf_counter() - start)
+        for text, prediction in zip(misses, predictions):
+            category_cache.set((loaded.version, text), prediction)
+            results[text] = prediction
+
+    # Off the request path: a sampled share is re-scored by the candidate version, if any
+    category_registry.maybe_shadow(unique_texts, [results[text] for text in unique_texts], _same_category)
+    return loaded.version, [results[text] for text in texts]
+
+
+def categorize_transaction_text(description: str) -> Tuple[Optional[str], Optional[float], Optional[str]]:
+    """
+    Categorizes a single transaction description using the active model.
+    Returns (category, confidence, model_version).
+    """
+    try:
+        version, results = categorize_transactions_batch([description])
+        category, confidence = results[0]
+        return category, confidence, version
+    except Exception:
+        return None, None, None
 
 # --- Add inference functions for Health, Education, Assistant ---
 
 def recommend_recipes_stub(ingredients: List[str], goals: List[str]) -> List[Dict]:
-    print(f"Stub: Recommending recipes based on {ingredients} and {goals}")
+    logger.debug("Stub: Recommending recipes based on %s and %s", ingredients, goals)
     # TODO: Implement actual recipe recommendation logic
     return [{"name": "Placeholder Healthy Salad", "id": "recipe1"}, {"name": "Placeholder Chicken Stir-fry", "id": "recipe2"}]
 
 def parse_command_stub(command_text: str) -> Dict[str, Any]:
-    print(f"Stub: Parsing command '{command_text}'")
+    logger.debug("Stub: Parsing command %r", command_text)
     # TODO: Implement actual NLP for intent recognition and entity extraction
     intent = "unknown"
     entities = {}
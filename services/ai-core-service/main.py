@@ -1,15 +1,27 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request, Response
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
+import logging
 import os
+import secrets
+import time
 
 # Import your inference functions (assuming they are in inference.py)
 from .inference import (
     analyze_financial_data,
     categorize_transaction_text,
+    categorize_transactions_batch,
+    get_model_info,
+    load_finance_models,
+    category_registry,
+    MAX_CATEGORIZE_BATCH,
     recommend_recipes_stub,
     parse_command_stub
 )
+from . import metrics
+from .tracing import start_span
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Multifaceted AI Core Service",
@@ -17,6 +29,47 @@ app = FastAPI(
     version="0.1.0"
 )
 
+# --- Observability ---
+
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    """ Records per-route latency and an optional trace span continuing the caller's traceparent """
+    if request.url.path == "/metrics":
+        return await call_next(request)
+
+    status_code = 500
+    start = time.perf_counter()
+    metrics.REQUESTS_IN_PROGRESS.inc()
+    try:
+        with start_span(
+            "http.request",
+            traceparent=request.headers.get("traceparent"),
+            method=request.method,
+            path=request.url.path,
+        ) as span:
+            response = await call_next(request)
+            status_code = response.status_code
+            if span is not None:
+                span.attributes["status"] = status_code
+        return response
+    finally:
+        metrics.REQUESTS_IN_PROGRESS.dec()
+        # Use the matched route template, not the raw path, to keep label cardinality bounded
+        route = request.scope.get("route")
+        metrics.REQUEST_LATENCY.labels(
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status_code),
+        ).observe(time.perf_counter() - start)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """ Prometheus scrape endpoint """
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
+
+
 # --- Pydantic Models for Request/Response Validation ---
 
 class TransactionInput(BaseModel):
@@ -42,8 +95,25 @@ class CategorizationRequest(BaseModel):
 class CategorizationResponse(BaseModel):
     suggested_category: Optional[str] = None
     confidence: Optional[float] = None
+    model_version: Optional[str] = None
     error: Optional[str] = None
 
+class BatchCategorizationRequest(BaseModel):
+    descriptions: List[str] # Results are returned in the same order
+
+class BatchCategorizationResponse(BaseModel):
+    results: List[CategorizationResponse]
+    model_version: Optional[str] = None # Lets callers detect rows categorized by an older model
+
+class ModelArtifactSpec(BaseModel):
+    artifact: str # Path relative to the models directory, e.g. finance/category_classifier-v2.joblib
+    version: Optional[str] = None # Defaults to a hash of the artifact
+    shadow_sample_rate: float = Field(0.0, ge=0.0, le=1.0) # Candidate only: share of traffic to shadow-score
+
+class ModelManifest(BaseModel):
+    active: Optional[ModelArtifactSpec] = None
+    candidate: Optional[ModelArtifactSpec] = None
+
 # --- Add models for Health, Education, Assistant ---
 
 
@@ -54,27 +124,147 @@ async def analyze_financial_endpoint(request: FinancialAnalysisRequest):
     """ Analyzes financial transactions to generate insights. """
     try:
         # Call the actual analysis function from inference.py
-        results = analyze_financial_data(request.user_id, request.transactions, request.requested_insights)
+        start = time.perf_counter()
+        with start_span("inference.analyze_financial", batch_size=len(request.transactions)):
+            # analyze_financial_data works on plain dicts, not Pydantic models
+            transactions = [tx.dict() for tx in request.transactions]
+            results = analyze_financial_data(request.user_id, transactions, request.requested_insights)
+        metrics.INFERENCE_SECONDS.labels(
+            model="financial_analysis", batch_size=metrics.batch_size_bucket(len(request.transactions))
+        ).observe(time.perf_counter() - start)
         return FinancialAnalysisResponse(insights=results)
     except Exception as e:
-        print(f"Error during financial analysis: {e}") # Log the error
+        metrics.INFERENCE_ERRORS.labels(model="financial_analysis").inc()
+        logger.exception("Error during financial analysis")
         # Return generic error or more specific based on exception type
         raise HTTPException(status_code=500, detail=f"Failed to analyze financial data: {e}")
 
 
 @app.post("/categorize/transaction", response_model=CategorizationResponse)
-async def categorize_transaction_endpoint(request: CategorizationRequest):
+def categorize_transaction_endpoint(request: CategorizationRequest):
     """ Suggests a category for a financial transaction based on its description. """
     if not request.description:
          raise HTTPException(status_code=400, detail="Transaction description is required.")
     try:
         # Call the categorization function from inference.py
-        category, confidence = categorize_transaction_text(request.description)
-        return CategorizationResponse(suggested_category=category, confidence=confidence)
+        category, confidence, model_version = categorize_transaction_text(request.description)
+        return CategorizationResponse(suggested_category=category, confidence=confidence, model_version=model_version)
     except Exception as e:
-        print(f"Error during transaction categorization: {e}") # Log the error
+        logger.exception("Error during transaction categorization")
         raise HTTPException(status_code=500, detail=f"Failed to categorize transaction: {e}")
 
+
+# Plain `def`: FastAPI runs it in its threadpool, so a 5000-item predict_proba
+# doesn't stall /health, /metrics and every other request on the event loop
+@app.post("/categorize/transactions", response_model=BatchCategorizationResponse)
+def categorize_transactions_batch_endpoint(request: BatchCategorizationRequest):
+    """ Suggests categories for many descriptions in one model call (used by bulk re-categorization). """
+    if len(request.descriptions) > MAX_CATEGORIZE_BATCH:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_CATEGORIZE_BATCH} descriptions per request.")
+    try:
+        model_version, predictions = categorize_transactions_batch(request.descriptions)
+    except Exception as e:
+        logger.exception("Error during batch transaction categorization")
+        raise HTTPException(status_code=500, detail=f"Failed to categorize transactions: {e}")
+    if model_version is None:
+        raise HTTPException(status_code=503, detail="Category classifier model is not loaded.")
+    return BatchCategorizationResponse(
+        results=[
+            CategorizationResponse(suggested_category=category, confidence=confidence, model_version=model_version)
+            for category, confidence in predictions
+        ],
+        model_version=model_version,
+    )
+
+
+@app.get("/models")
+async def models_endpoint():
+    """ Reports which models are loaded and their versions """
+    return get_model_info()
+
+
+# --- Model management ---
+# These rewrite the model manifest; every worker reading that manifest file follows it,
+# loading and warming new versions in the background before swapping. The calls are
+# per filesystem: to change every ai-core pod, FINANCE_MODEL_MANIFEST and MODEL_DIR must
+# be on a volume all pods mount. Disabled unless MODEL_ADMIN_TOKEN is set.
+
+def _require_model_admin(token: Optional[str]):
+    expected = os.environ.get("MODEL_ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=403, detail="Model management is disabled (MODEL_ADMIN_TOKEN not set).")
+    if not token or not secrets.compare_digest(token, expected):
+        raise HTTPException(status_code=401, detail="Invalid model admin token.")
+
+
+def _spec_dict(spec: Optional[ModelArtifactSpec]) -> Optional[Dict[str, Any]]:
+    return spec.dict(exclude_none=True) if spec else None
+
+
+def _active_spec(manifest: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """ The manifest's active spec, pinned to the version this worker serves so a rollback restores exactly it """
+    spec = dict(manifest.get("active") or {})
+    active = category_registry.active
+    if active is not None and spec.get("artifact", active.artifact) == active.artifact:
+        spec.update(artifact=active.artifact, version=spec.get("version") or active.version)
+    spec.pop("shadow_sample_rate", None)
+    return spec or None
+
+
+def _write_category_manifest(current: Dict[str, Any], active: Optional[Dict[str, Any]], candidate: Optional[Dict[str, Any]]):
+    """ Writes a new manifest; when the active version changes the old one is recorded as the rollback target """
+    previous = current.get("previous")
+    old = _active_spec(current)
+    if active and old and (active["artifact"], active.get("version") or old.get("version")) != (old["artifact"], old.get("version")):
+        previous = old
+    category_registry.write_manifest({"active": active, "candidate": candidate, "previous": previous})
+
+
+@app.put("/models/category_classifier/manifest")
+async def update_category_manifest(manifest: ModelManifest, x_model_admin_token: Optional[str] = Header(None)):
+    """ Sets the active and/or candidate (shadow) classifier versions for every worker sharing the manifest file """
+    _require_model_admin(x_model_admin_token)
+    for spec in (manifest.active, manifest.candidate):
+        if spec is None:
+            continue
+        try:
+            path = category_registry.resolve_artifact(spec.artifact)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if not os.path.exists(path):
+            raise HTTPException(status_code=404, detail=f"Artifact {spec.artifact!r} not found.")
+
+    current = category_registry.read_manifest() or {}
+    # Omitting "active" keeps the current active version
+    _write_category_manifest(current, _spec_dict(manifest.active) or current.get("active"), _spec_dict(manifest.candidate))
+    return get_model_info()["category_classifier"]
+
+
+@app.post("/models/category_classifier/promote")
+async def promote_category_candidate(x_model_admin_token: Optional[str] = Header(None)):
+    """ Makes the current shadow candidate the active version (in every worker sharing the manifest file) """
+    _require_model_admin(x_model_admin_token)
+    current = category_registry.read_manifest() or {}
+    candidate = current.get("candidate")
+    if not candidate:
+        raise HTTPException(status_code=409, detail="No candidate version to promote.")
+    candidate.pop("shadow_sample_rate", None)
+    _write_category_manifest(current, candidate, None)
+    return get_model_info()["category_classifier"]
+
+
+@app.post("/models/category_classifier/rollback")
+async def rollback_category_classifier(x_model_admin_token: Optional[str] = Header(None)):
+    """ Swaps the previously active version (recorded in the shared manifest) back in """
+    _require_model_admin(x_model_admin_token)
+    current = category_registry.read_manifest() or {}
+    previous = current.get("previous")
+    if not previous:
+        raise HTTPException(status_code=409, detail="No previous version to roll back to.")
+    # Loaded from disk in the background like any other version; the rolled-back one becomes the new "previous"
+    _write_category_manifest(current, previous, None)
+    return get_model_info()["category_classifier"]
+
 # --- Add endpoints for Health, Education, Assistant ---
 # @app.post("/recommend/recipes", ...)
 # async def recommend_recipes_endpoint(...):
@@ -90,11 +280,11 @@ async def health_check():
     """ Basic health check endpoint """
     return {"status": "ok"}
 
-# --- Add startup events if needed to load models ---
-# @app.on_event("startup")
-# async def load_models():
-#     print("Loading AI models...")
-#     # Call functions in inference.py to load models into memory
-#     load_finance_models()
-#     load_assistant_models()
-#     print("Models loaded.")
+# --- Startup: load models before serving so the first requests don't pay the cold-load cost ---
+@app.on_event("startup")
+async def load_models():
+    logger.info("Loading AI models...")
+    # Call functions in inference.py to load models into memory
+    load_finance_models()
+    # load_assistant_models()
+    logger.info("Models loaded.")
@@ -0,0 +1,98 @@
+import os
+from typing import Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+# --- Prometheus metrics for the AI core service ---
+# With several uvicorn/gunicorn workers, set PROMETHEUS_MULTIPROC_DIR so that
+# /metrics aggregates samples from every worker process.
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LOAD_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+REQUEST_LATENCY = Histogram(
+    'ai_core_http_request_duration_seconds',
+    'Latency of HTTP requests handled by the AI core service.',
+    ['method', 'route', 'status'],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'ai_core_http_requests_in_progress',
+    'HTTP requests currently queued or being served.',
+    multiprocess_mode='livesum',
+)
+
+MODEL_LOAD_SECONDS = Histogram(
+    'ai_core_model_load_duration_seconds',
+    'Time taken to load a model artifact from disk.',
+    ['model'],
+    buckets=LOAD_BUCKETS,
+)
+MODEL_LOADED = Gauge(
+    'ai_core_model_loaded',
+    'Whether the model is currently loaded (1) or not (0).',
+    ['model'],
+    multiprocess_mode='liveall',
+)
+
+MODEL_VERSION_INFO = Gauge(
+    'ai_core_model_version_info',
+    'Set to 1 for each model version currently loaded, by role (active or candidate).',
+    ['model', 'version', 'role'],
+    multiprocess_mode='liveall',
+)
+MODEL_SWAPS = Counter(
+    'ai_core_model_swaps_total',
+    'Times a new model version was swapped in as active.',
+    ['model'],
+)
+SHADOW_RESULTS = Counter(
+    'ai_core_shadow_predictions_total',
+    'Shadow-scored predictions by outcome (agree, disagree, error, dropped).',
+    ['model', 'outcome'],
+)
+SHADOW_QUEUE = Gauge(
+    'ai_core_shadow_queue_depth',
+    'Shadow scoring batches waiting to run.',
+    ['model'],
+    multiprocess_mode='livesum',
+)
+
+INFERENCE_SECONDS = Histogram(
+    'ai_core_inference_duration_seconds',
+    'Model inference time per call, by batch size bucket.',
+    ['model', 'batch_size'],
+    buckets=LATENCY_BUCKETS,
+)
+INFERENCE_ERRORS = Counter(
+    'ai_core_inference_errors_total',
+    'Inference calls that raised an exception.',
+    ['model'],
+)
+
+def batch_size_bucket(size: int) -> str:
+    """ Rounds a batch size up to a power of two so the label set stays small """
+    if size <= 1:
+        return '1'
+    bucket = 1
+    while bucket < size and bucket < 4096:
+        bucket *= 2
+    return str(bucket) if bucket >= size else '4096+'
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """ Returns (body, content_type) in the Prometheus text exposition format """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,350 @@
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import joblib
+
+from .metrics import (
+    MODEL_LOAD_SECONDS,
+    MODEL_LOADED,
+    MODEL_SWAPS,
+    MODEL_VERSION_INFO,
+    SHADOW_QUEUE,
+    SHADOW_RESULTS,
+)
+
+logger = logging.getLogger(__name__)
+
+# --- Versioned model registry ---
+# Each model has an active version serving requests and an optional candidate.
+# New versions are loaded and warmed on a background thread, then swapped in
+# with a single reference assignment: requests already holding the old version
+# finish on it, new requests get the new one, nothing is dropped.
+#
+# The desired state lives in a JSON manifest next to the artifacts, e.g.
+#   {"active": {"artifact": "finance/category_classifier-v2.joblib", "version": "v2"},
+#    "candidate": {"artifact": "finance/category_classifier-v3.joblib", "shadow_sample_rate": 0.05},
+#    "previous": {"artifact": "finance/category_classifier-v1.joblib", "version": "v1"}}
+# "previous" is only a record for rollback; it is never loaded until it becomes active again.
+# Every worker process polls the manifest file, so one update reaches every worker that
+# reads the same file. With several ai-core pods, the manifest (FINANCE_MODEL_MANIFEST)
+# and the artifacts it names (MODEL_DIR) must be on a volume shared by all of them;
+# otherwise each pod has its own manifest and an update only changes the pod that wrote it.
+
+
+def artifact_version(path: str) -> str:
+    """ Short content hash of a model artifact, used as its version unless one is given """
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+class LoadedModel:
+    """ A loaded, warmed model artifact and its version """
+
+    def __init__(self, name: str, version: str, model: Any, artifact: str, load_seconds: float):
+        self.name = name
+        self.version = version
+        self.model = model
+        self.artifact = artifact
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "artifact": self.artifact,
+            "load_seconds": round(self.load_seconds, 3),
+            "loaded_at": self.loaded_at,
+        }
+
+
+class ModelRegistry:
+    """
+    Holds the active and candidate versions of one model.
+
+    `predict_fn(model, inputs)` runs a batch through a model and is used both for
+    warm-up and for shadow scoring. `warmup_inputs` is the sample batch run
+    against a new version before it may serve traffic; a version that fails
+    warm-up is never swapped in.
+    """
+
+    def __init__(self, name: str, model_dir: str, default_artifact: str,
+                 predict_fn: Callable[[Any, List[Any]], List[Any]], warmup_inputs: List[Any],
+                 manifest_path: Optional[str] = None, shadow_queue_size: int = 100):
+        self.name = name
+        self.model_dir = os.path.realpath(model_dir)
+        self.default_artifact = default_artifact
+        self.manifest_path = manifest_path
+        self.predict_fn = predict_fn
+        self.warmup_inputs = warmup_inputs
+        self.shadow_queue_size = shadow_queue_size
+        self.shadow_sample_rate = 0.0
+        self.last_error: Optional[str] = None
+
+        self._active: Optional[LoadedModel] = None
+        self._candidate: Optional[LoadedModel] = None
+        self._lock = threading.Lock() # Serializes swaps; readers never take it
+        self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{name}-loader")
+        self._shadow_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{name}-shadow")
+        self._shadow_pending = 0
+        self._shadow_lock = threading.Lock()
+        self._pending_loads = set() # (artifact, version, as_candidate) keys queued on the loader
+        self._desired: Optional[Dict[str, Any]] = None # Last manifest passed to sync()
+        self._sync_lock = threading.Lock() # sync() runs from the watcher and from write_manifest()
+        self._manifest_mtime: Optional[float] = None
+        self._watcher: Optional[threading.Thread] = None
+
+    # --- Reading ---
+
+    @property
+    def active(self) -> Optional[LoadedModel]:
+        """ Snapshot of the serving version; take it once per request and use it throughout """
+        return self._active
+
+    @property
+    def candidate(self) -> Optional[LoadedModel]:
+        return self._candidate
+
+    def info(self) -> Dict[str, Any]:
+        active, candidate = self._active, self._candidate
+        return {
+            "loaded": active is not None,
+            "version": active.version if active else None,
+            "active": active.info() if active else None,
+            "candidate": candidate.info() if candidate else None,
+            # Rollback target, kept in the manifest so every worker agrees on it
+            "previous": (self._desired or {}).get("previous"),
+            "shadow_sample_rate": self.shadow_sample_rate if candidate else 0.0,
+            "last_error": self.last_error,
+        }
+
+    # --- Loading ---
+
+    def resolve_artifact(self, artifact: str) -> str:
+        """ Artifacts are pickles; only ones inside the model directory may be loaded """
+        path = os.path.realpath(os.path.join(self.model_dir, artifact))
+        if os.path.commonpath([path, self.model_dir]) != self.model_dir:
+            raise ValueError(f"Artifact {artifact!r} is outside the model directory.")
+        return path
+
+    def load(self, artifact: str, version: Optional[str] = None) -> LoadedModel:
+        """ Loads and warms an artifact without making it visible to requests """
+        path = self.resolve_artifact(artifact)
+        start = time.perf_counter()
+        model = joblib.load(path)
+        version = version or artifact_version(path)
+        self.predict_fn(model, self.warmup_inputs) # Fails the load if the artifact can't serve
+        load_seconds = time.perf_counter() - start
+        MODEL_LOAD_SECONDS.labels(model=self.name).observe(load_seconds)
+        logger.info("Loaded %s %s from %s in %.2fs", self.name, version, artifact, load_seconds)
+        return LoadedModel(self.name, version, model, artifact, load_seconds)
+
+    def load_active(self, artifact: Optional[str] = None, version: Optional[str] = None) -> Optional[LoadedModel]:
+        """ Synchronous load-and-swap, used at startup before traffic arrives """
+        try:
+            self.promote(self.load(artifact or self.default_artifact, version))
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            logger.exception("Error loading %s", self.name)
+        return self._active
+
+    def _desired_spec(self, as_candidate: bool) -> Optional[Dict[str, Any]]:
+        desired = self._desired
+        if desired is None:
+            return None
+        return desired.get("candidate" if as_candidate else "active") or {}
+
+    def _still_wanted(self, artifact: str, version: Optional[str], as_candidate: bool) -> bool:
+        """ Whether the latest manifest still asks for this artifact in this role (no manifest: always) """
+        spec = self._desired_spec(as_candidate)
+        if spec is None:
+            return True
+        return spec.get("artifact") == artifact and spec.get("version") in (None, version)
+
+    def load_in_background(self, artifact: str, version: Optional[str] = None, as_candidate: bool = False,
+                           shadow_sample_rate: float = 0.0) -> Optional[Future]:
+        """
+        Loads on the loader thread, then promotes it or installs it as the shadow
+        candidate. The manifest may change while the load is queued or running,
+        so the task re-checks it before loading and again before swapping, and
+        drops results the manifest no longer asks for.
+        """
+        key = (artifact, version, as_candidate)
+
+        def task():
+            try:
+                if not self._still_wanted(artifact, version, as_candidate):
+                    logger.info("Skipping stale %s load of %s", self.name, artifact)
+                    return None
+                active = self._active
+                if not as_candidate and active is not None and active.artifact == artifact and version in (None, active.version):
+                    return active # Already swapped in, e.g. promoted from the candidate while this was queued
+                loaded = self.load(artifact, version)
+                with self._sync_lock:
+                    if self._still_wanted(artifact, loaded.version, as_candidate):
+                        if as_candidate:
+                            spec = self._desired_spec(True)
+                            rate = float(spec.get("shadow_sample_rate", 0.0)) if spec is not None else shadow_sample_rate
+                            self.set_candidate(loaded, rate)
+                        else:
+                            self.promote(loaded)
+                    elif as_candidate and self._desired is not None and self._still_wanted(artifact, loaded.version, False):
+                        self.promote(loaded) # Promoted while it was still loading as the candidate
+                    else:
+                        logger.info("Discarding %s %s: the manifest changed while it loaded", self.name, loaded.version)
+                        return None
+                self.last_error = None
+                return loaded
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                logger.exception("Background load of %s from %s failed; keeping current version", self.name, artifact)
+                raise
+            finally:
+                with self._lock:
+                    self._pending_loads.discard(key)
+
+        with self._lock:
+            if key in self._pending_loads:
+                return None # The same load is already queued
+            self._pending_loads.add(key)
+        return self._loader.submit(task)
+
+    # --- Swapping ---
+
+    def promote(self, loaded: Optional[LoadedModel] = None) -> LoadedModel:
+        """ Makes `loaded` (default: the current candidate) the active version """
+        with self._lock:
+            loaded = loaded or self._candidate
+            if loaded is None:
+                raise ValueError(f"No {self.name} candidate to promote.")
+            old = self._active
+            self._active = loaded # Atomic reference swap
+            if self._candidate is loaded:
+                self._candidate = None
+                MODEL_VERSION_INFO.labels(model=self.name, version=loaded.version, role="candidate").set(0)
+        if old is not None and old.version != loaded.version:
+            MODEL_VERSION_INFO.labels(model=self.name, version=old.version, role="active").set(0)
+            MODEL_SWAPS.labels(model=self.name).inc()
+            logger.info("Swapped %s: %s -> %s", self.name, old.version, loaded.version)
+        MODEL_VERSION_INFO.labels(model=self.name, version=loaded.version, role="active").set(1)
+        MODEL_LOADED.labels(model=self.name).set(1)
+        return loaded
+
+    def set_candidate(self, loaded: Optional[LoadedModel], shadow_sample_rate: float = 0.0):
+        with self._lock:
+            old = self._candidate
+            self._candidate = loaded
+            self.shadow_sample_rate = max(0.0, min(1.0, shadow_sample_rate)) if loaded else 0.0
+        if old is not None:
+            MODEL_VERSION_INFO.labels(model=self.name, version=old.version, role="candidate").set(0)
+        if loaded is not None:
+            MODEL_VERSION_INFO.labels(model=self.name, version=loaded.version, role="candidate").set(1)
+
+    # --- Shadow scoring ---
+
+    def maybe_shadow(self, inputs: List[Any], primary_outputs: List[Any], compare: Callable[[Any, Any], bool]):
+        """
+        Scores a sampled share of traffic with the candidate on a background
+        thread. Never blocks or fails the request; drops work when the queue is full.
+        """
+        candidate = self._candidate
+        if candidate is None or not inputs or random.random() >= self.shadow_sample_rate:
+            return
+        with self._shadow_lock:
+            if self._shadow_pending >= self.shadow_queue_size:
+                SHADOW_RESULTS.labels(model=self.name, outcome="dropped").inc(len(inputs))
+                return
+            self._shadow_pending += 1
+        SHADOW_QUEUE.labels(model=self.name).inc()
+        self._shadow_pool.submit(self._score_shadow, candidate, list(inputs), list(primary_outputs), compare)
+
+    def _score_shadow(self, candidate: LoadedModel, inputs, primary_outputs, compare):
+        try:
+            shadow_outputs = self.predict_fn(candidate.model, inputs)
+            agree = sum(1 for a, b in zip(primary_outputs, shadow_outputs) if compare(a, b))
+            SHADOW_RESULTS.labels(model=self.name, outcome="agree").inc(agree)
+            SHADOW_RESULTS.labels(model=self.name, outcome="disagree").inc(len(inputs) - agree)
+        except Exception:
+            SHADOW_RESULTS.labels(model=self.name, outcome="error").inc(len(inputs))
+            logger.exception("Shadow scoring with %s %s failed", self.name, candidate.version)
+        finally:
+            with self._shadow_lock:
+                self._shadow_pending -= 1
+            SHADOW_QUEUE.labels(model=self.name).dec()
+
+    # --- Manifest ---
+
+    def read_manifest(self) -> Optional[Dict[str, Any]]:
+        if not self.manifest_path or not os.path.exists(self.manifest_path):
+            return None
+        with open(self.manifest_path) as fh:
+            return json.load(fh)
+
+    def write_manifest(self, manifest: Dict[str, Any]):
+        """ Atomically replaces the manifest (workers sharing the file pick it up) and applies it here right away """
+        if not self.manifest_path:
+            raise ValueError(f"No manifest path configured for {self.name}.")
+        tmp_path = f"{self.manifest_path}.tmp.{os.getpid()}"
+        with open(tmp_path, "w") as fh:
+            json.dump(manifest, fh, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+        self.sync(manifest)
+
+    def sync(self, manifest: Optional[Dict[str, Any]] = None):
+        """ Starts whatever background loads/swaps are needed to match the manifest """
+        manifest = manifest if manifest is not None else self.read_manifest()
+        if manifest is None:
+            return
+        with self._sync_lock:
+            self._desired = manifest
+            self._apply(manifest)
+
+    def _apply(self, manifest: Dict[str, Any]):
+        desired_active = manifest.get("active")
+        if desired_active:
+            version = desired_active.get("version")
+            candidate, active = self._candidate, self._active
+            if candidate is not None and candidate.artifact == desired_active["artifact"] and version in (None, candidate.version):
+                self.promote(candidate) # Already loaded and warmed as the shadow candidate
+            elif active is None or active.artifact != desired_active["artifact"] or version not in (None, active.version):
+                self.load_in_background(desired_active["artifact"], version)
+
+        desired_candidate = manifest.get("candidate")
+        if not desired_candidate:
+            self.set_candidate(None)
+        else:
+            rate = float(desired_candidate.get("shadow_sample_rate", 0.0))
+            candidate = self._candidate
+            if candidate is not None and candidate.artifact == desired_candidate["artifact"]:
+                self.set_candidate(candidate, rate)
+            else:
+                self.load_in_background(desired_candidate["artifact"], desired_candidate.get("version"),
+                                        as_candidate=True, shadow_sample_rate=rate)
+
+    def start_watching(self, interval: float):
+        """ Polls the manifest's mtime so every worker process reading this file follows manifest updates """
+        if not self.manifest_path or interval <= 0 or self._watcher is not None:
+            return
+
+        def watch():
+            while True:
+                try:
+                    mtime = os.path.getmtime(self.manifest_path) if os.path.exists(self.manifest_path) else None
+                    if mtime is not None and mtime != self._manifest_mtime:
+                        self._manifest_mtime = mtime
+                        self.sync()
+                except Exception:
+                    logger.exception("Error applying %s manifest", self.name)
+                time.sleep(interval)
+
+        self._watcher = threading.Thread(target=watch, name=f"{self.name}-manifest-watcher", daemon=True)
+        self._watcher.start()
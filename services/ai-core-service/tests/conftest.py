@@ -0,0 +1,55 @@
+import importlib
+import os
+import sys
+
+import joblib
+import pytest
+
+# The service directory isn't a valid package name and its modules use relative
+# imports, so tests load them as submodules of the "ai-core-service" namespace package.
+_SERVICES_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _SERVICES_DIR not in sys.path:
+    sys.path.insert(0, _SERVICES_DIR)
+
+
+def service_module(name):
+    return importlib.import_module(f"ai-core-service.{name}")
+
+
+class ConstantModel:
+    """ Picklable stand-in for a classifier: predicts `label` for everything, or fails """
+
+    def __init__(self, label, fail=False):
+        self.label = label
+        self.fail = fail
+
+    def predict(self, texts):
+        if self.fail:
+            raise RuntimeError(f"{self.label} cannot predict")
+        return [self.label] * len(texts)
+
+
+def make_registry(model_dir, name, predict_fn):
+    """ A registry over model_dir's artifacts and manifest.json, defaulting to a.joblib """
+    return service_module("model_registry").ModelRegistry(
+        name,
+        model_dir=str(model_dir),
+        default_artifact="a.joblib",
+        predict_fn=predict_fn,
+        warmup_inputs=["warm-up"],
+        manifest_path=str(model_dir / "manifest.json"),
+    )
+
+
+def wait_for_background_work(registry):
+    """ Both executors are single-threaded, so a no-op queued behind pending work waits for it """
+    registry._loader.submit(lambda: None).result(timeout=10)
+    registry._shadow_pool.submit(lambda: None).result(timeout=10)
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    """ A models directory with a.joblib and b.joblib, predicting "a" and "b" """
+    for label in ("a", "b"):
+        joblib.dump(ConstantModel(label), tmp_path / f"{label}.joblib")
+    return tmp_path
@@ -0,0 +1,100 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from .conftest import make_registry, service_module, wait_for_background_work
+
+main = service_module("main")
+inference = service_module("inference")
+
+ADMIN = {"X-Model-Admin-Token": "secret"}
+
+
+def _new_registry(model_dir):
+    """ A fresh registry over the same manifest, like another worker process """
+    return make_registry(model_dir, "category_classifier", inference._predict_categories)
+
+
+def _use_registry(monkeypatch, registry):
+    # main imported the name from inference, so both references are patched
+    monkeypatch.setattr(main, "category_registry", registry)
+    monkeypatch.setattr(inference, "category_registry", registry)
+
+
+@pytest.fixture
+def registry(model_dir, monkeypatch):
+    monkeypatch.setenv("MODEL_ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(inference, "category_cache", inference.LRUCache("test_category_classifier", 0))
+    registry = _new_registry(model_dir)
+    registry.load_active("a.joblib", "va")
+    _use_registry(monkeypatch, registry)
+    return registry
+
+
+@pytest.fixture
+def client():
+    # Not used as a context manager, so the startup model load doesn't run
+    return TestClient(main.app)
+
+
+def test_health(client):
+    assert client.get("/health").json() == {"status": "ok"}
+
+
+def test_batch_categorization_reports_model_version(client, registry):
+    response = client.post("/categorize/transactions", json={"descriptions": ["x", "y", "x"]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["model_version"] == "va"
+    assert [r["suggested_category"] for r in body["results"]] == ["a", "a", "a"]
+
+
+def test_batch_categorization_without_a_model_is_unavailable(client, model_dir, monkeypatch):
+    _use_registry(monkeypatch, _new_registry(model_dir))
+
+    response = client.post("/categorize/transactions", json={"descriptions": ["x"]})
+
+    assert response.status_code == 503
+
+
+def test_batch_categorization_rejects_oversized_batches(client, registry, monkeypatch):
+    monkeypatch.setattr(main, "MAX_CATEGORIZE_BATCH", 2)
+
+    response = client.post("/categorize/transactions", json={"descriptions": ["x", "y", "z"]})
+
+    assert response.status_code == 413
+
+
+def test_model_admin_requires_token(client, registry):
+    assert client.post("/models/category_classifier/promote").status_code == 401
+
+
+def test_rollback_without_previous_version_conflicts(client, registry):
+    assert client.post("/models/category_classifier/rollback", headers=ADMIN).status_code == 409
+
+
+def test_promote_then_rollback_on_any_worker(client, registry, model_dir, monkeypatch):
+    response = client.put(
+        "/models/category_classifier/manifest", headers=ADMIN,
+        json={"candidate": {"artifact": "b.joblib", "version": "vb", "shadow_sample_rate": 0.1}},
+    )
+    assert response.status_code == 200
+    wait_for_background_work(registry)
+
+    assert client.post("/models/category_classifier/promote", headers=ADMIN).status_code == 200
+    wait_for_background_work(registry)
+    assert registry.active.version == "vb"
+    assert registry.read_manifest()["previous"] == {"artifact": "a.joblib", "version": "va"}
+
+    # A worker started after the promotion never held version "va" in memory
+    fresh = _new_registry(model_dir)
+    fresh.load_active("b.joblib", "vb")
+    fresh.sync()
+    _use_registry(monkeypatch, fresh)
+
+    response = client.post("/models/category_classifier/rollback", headers=ADMIN)
+    wait_for_background_work(fresh)
+
+    assert response.status_code == 200
+    assert fresh.active.version == "va"
+    assert fresh.read_manifest()["previous"] == {"artifact": "b.joblib", "version": "vb"}
@@ -0,0 +1,164 @@
+import threading
+
+import joblib
+import pytest
+from prometheus_client import REGISTRY
+
+from .conftest import ConstantModel, make_registry, service_module, wait_for_background_work
+
+model_registry = service_module("model_registry")
+
+
+def _predict(model, texts):
+    return model.predict(texts)
+
+
+def _same(primary, shadow):
+    return primary == shadow
+
+
+@pytest.fixture
+def model_dir(model_dir):
+    """ The shared models directory plus broken.joblib, whose predictions always fail """
+    joblib.dump(ConstantModel("broken", fail=True), model_dir / "broken.joblib")
+    return model_dir
+
+
+@pytest.fixture
+def registry(model_dir, request):
+    # A name per test keeps the per-model Prometheus samples independent
+    return make_registry(model_dir, f"test_{request.node.name}", _predict)
+
+
+@pytest.fixture
+def slow_b_load(monkeypatch):
+    """ Holds loads of b.joblib until the returned event is set """
+    release = threading.Event()
+    real_load = joblib.load
+
+    def slow_load(path):
+        if str(path).endswith("b.joblib"):
+            release.wait(10)
+        return real_load(path)
+
+    monkeypatch.setattr(model_registry.joblib, "load", slow_load)
+    yield release
+    release.set()
+
+
+def _metric(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_load_active_swaps_in_a_warmed_version(registry):
+    loaded = registry.load_active("a.joblib", "va")
+
+    assert loaded is registry.active
+    assert registry.info()["version"] == "va"
+    assert loaded.model.predict(["x"]) == ["a"]
+
+
+def test_load_active_failure_leaves_model_unloaded(registry):
+    assert registry.load_active("missing.joblib") is None
+    assert registry.active is None
+    assert "missing.joblib" in registry.last_error
+
+
+def test_manifest_update_swaps_in_background_without_dropping_old_snapshot(registry):
+    registry.load_active("a.joblib", "va")
+    in_flight = registry.active # What a request that started before the swap holds
+
+    registry.write_manifest({"active": {"artifact": "b.joblib", "version": "vb"}, "candidate": None})
+    wait_for_background_work(registry)
+
+    assert registry.active.version == "vb"
+    assert in_flight.model.predict(["x"]) == ["a"]
+    assert _metric("ai_core_model_swaps_total", model=registry.name) == 1
+
+
+def test_version_failing_warm_up_is_never_swapped_in(registry):
+    registry.load_active("a.joblib", "va")
+
+    registry.write_manifest({"active": {"artifact": "broken.joblib", "version": "vx"}, "candidate": None})
+    wait_for_background_work(registry)
+
+    assert registry.active.version == "va"
+    assert "cannot predict" in registry.last_error
+
+
+def test_artifacts_outside_the_model_directory_are_rejected(registry):
+    with pytest.raises(ValueError):
+        registry.resolve_artifact("../outside.joblib")
+
+
+def test_candidate_is_shadow_scored_at_its_sample_rate(registry):
+    registry.load_active("a.joblib", "va")
+    registry.write_manifest({
+        "active": {"artifact": "a.joblib", "version": "va"},
+        "candidate": {"artifact": "b.joblib", "version": "vb", "shadow_sample_rate": 1.0},
+    })
+    wait_for_background_work(registry)
+    assert registry.candidate.version == "vb"
+
+    registry.maybe_shadow(["x", "y"], ["a", "a"], _same)
+    wait_for_background_work(registry)
+
+    assert _metric("ai_core_shadow_predictions_total", model=registry.name, outcome="disagree") == 2
+    assert _metric("ai_core_shadow_predictions_total", model=registry.name, outcome="agree") == 0
+
+
+def test_zero_sample_rate_scores_nothing(registry):
+    registry.load_active("a.joblib", "va")
+    registry.write_manifest({
+        "active": {"artifact": "a.joblib", "version": "va"},
+        "candidate": {"artifact": "b.joblib", "version": "vb", "shadow_sample_rate": 0.0},
+    })
+    wait_for_background_work(registry)
+
+    for _ in range(20):
+        registry.maybe_shadow(["x"], ["a"], _same)
+    wait_for_background_work(registry)
+
+    assert _metric("ai_core_shadow_predictions_total", model=registry.name, outcome="disagree") == 0
+
+
+def test_full_shadow_queue_drops_instead_of_blocking(registry):
+    registry.shadow_queue_size = 0
+    registry.load_active("a.joblib", "va")
+    registry.set_candidate(registry.load("b.joblib", "vb"), shadow_sample_rate=1.0)
+
+    registry.maybe_shadow(["x", "y", "z"], ["a", "a", "a"], _same)
+
+    assert _metric("ai_core_shadow_predictions_total", model=registry.name, outcome="dropped") == 3
+
+
+def test_promoting_a_candidate_that_is_still_loading(registry, slow_b_load):
+    registry.load_active("a.joblib", "va")
+
+    registry.write_manifest({
+        "active": {"artifact": "a.joblib", "version": "va"},
+        "candidate": {"artifact": "b.joblib", "version": "vb", "shadow_sample_rate": 1.0},
+    })
+    registry.write_manifest({"active": {"artifact": "b.joblib", "version": "vb"}, "candidate": None})
+    slow_b_load.set()
+    wait_for_background_work(registry)
+
+    info = registry.info()
+    assert info["version"] == "vb"
+    assert info["candidate"] is None
+    assert info["shadow_sample_rate"] == 0.0
+
+
+def test_candidate_replaced_while_loading_is_discarded(registry, slow_b_load):
+    registry.load_active("a.joblib", "va")
+
+    registry.write_manifest({
+        "active": {"artifact": "a.joblib", "version": "va"},
+        "candidate": {"artifact": "b.joblib", "version": "vb", "shadow_sample_rate": 0.5},
+    })
+    registry.write_manifest({"active": {"artifact": "a.joblib", "version": "va"}, "candidate": None})
+    slow_b_load.set()
+    wait_for_background_work(registry)
+
+    assert registry.active.version == "va"
+    assert registry.candidate is None
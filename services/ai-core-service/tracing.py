@@ -0,0 +1,81 @@
+import contextvars
+import json
+import logging
+import os
+import secrets
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger('ai_core.tracing')
+
+# --- Lightweight request tracing ---
+# Mirrors finance_api/tracing.py: W3C traceparent headers from the finance
+# service are continued here, so inference spans share the caller's trace id.
+# Finished spans are logged as JSON lines. Enabled with TRACING_ENABLED=true.
+
+TRACING_ENABLED = os.environ.get('TRACING_ENABLED', 'False').lower() in ('true', '1', 't')
+
+_current_span = contextvars.ContextVar('ai_core_current_span', default=None)
+
+
+class Span:
+    """ A single timed unit of work within a trace """
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, attributes: Optional[Dict] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self._start = time.perf_counter()
+        self._start_wall = time.time()
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def finish(self):
+        duration_ms = (time.perf_counter() - self._start) * 1000
+        logger.info(json.dumps({
+            'service': 'ai-core-service',
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self._start_wall,
+            'duration_ms': round(duration_ms, 3),
+            'attributes': self.attributes,
+        }, default=str))
+
+
+def parse_traceparent(value: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """ Returns (trace_id, parent_span_id) from a traceparent header, or (None, None) """
+    if not value:
+        return None, None
+    parts = value.strip().split('-')
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None, None
+    return parts[1], parts[2]
+
+
+@contextmanager
+def start_span(name: str, traceparent: Optional[str] = None, **attributes):
+    """ Opens a child span of the current one (or of an incoming traceparent); yields None when disabled """
+    if not TRACING_ENABLED:
+        yield None
+        return
+
+    parent = _current_span.get()
+    if parent is not None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    else:
+        trace_id, parent_id = parse_traceparent(traceparent)
+        trace_id = trace_id or secrets.token_hex(16)
+
+    span = Span(name, trace_id, parent_id, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    finally:
+        _current_span.reset(token)
+        span.finish()
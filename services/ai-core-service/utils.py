@@ -0,0 +1,62 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from prometheus_client import Counter, Gauge
+
+_MISSING = object()
+
+# Exported by every LRUCache; see metrics.render_latest for the /metrics endpoint
+CACHE_ENTRIES = Gauge(
+    'ai_core_cache_entries',
+    'Entries currently held in an in-process cache.',
+    ['cache'],
+    multiprocess_mode='liveall',
+)
+CACHE_REQUESTS = Counter(
+    'ai_core_cache_requests_total',
+    'Cache lookups by outcome (hit or miss).',
+    ['cache', 'result'],
+)
+
+
+class LRUCache:
+    """
+    Small thread-safe LRU cache for inference results.
+    Hit/miss counts and the current size are exported as ai_core_cache_* metrics.
+    """
+
+    def __init__(self, name: str, max_entries: int):
+        self.name = name
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                CACHE_REQUESTS.labels(cache=self.name, result="miss").inc()
+                return default
+            self._data.move_to_end(key)
+        CACHE_REQUESTS.labels(cache=self.name, result="hit").inc()
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            size = len(self._data)
+        CACHE_ENTRIES.labels(cache=self.name).set(size)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+        CACHE_ENTRIES.labels(cache=self.name).set(0)
+
+    def __len__(self) -> int:
+        return len(self._data)